@@ -1,3 +1,5 @@
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from ngio import __version__ as ngio_version
@@ -13,10 +15,11 @@ from secure.headers import (
     XContentTypeOptions,
     XFrameOptions,
 )
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 from starlette.routing import Route
 from streamlit.starlette import App
 
@@ -33,6 +36,32 @@ async def endpoint_alive(request: Request) -> JSONResponse:
     )
 
 
+async def endpoint_metrics(request: Request) -> PlainTextResponse:
+    # Imported here, so that the config is not read before the app starts
+    from fractal_feature_explorer.config import get_config
+    from fractal_feature_explorer.utils.cache_metrics import render_metrics
+
+    if not get_config().metrics_endpoint:
+        return PlainTextResponse("Not Found", status_code=404)
+    metrics = await run_in_threadpool(render_metrics)
+    return PlainTextResponse(metrics, media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def lifespan(app: App):
+    # Imported here, so that the config is not read before the app starts
+    from fractal_feature_explorer.config import get_config
+    from fractal_feature_explorer.pages.setup_page._cache_warming import (
+        preload_plates,
+    )
+
+    config = get_config()
+    if config.deployment_type == "local" and config.preload:
+        # Warm the caches in the background, without delaying the server start
+        threading.Thread(target=preload_plates, name="preload", daemon=True).start()
+    yield
+
+
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     secure_headers: Secure
 
@@ -87,6 +116,10 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 app = App(
     Path(__file__).parent / "main.py",
-    routes=[Route("/alive", endpoint_alive)],
+    lifespan=lifespan,
+    routes=[
+        Route("/alive", endpoint_alive),
+        Route("/metrics", endpoint_metrics),
+    ],
     middleware=[Middleware(SecurityHeadersMiddleware)],
 )
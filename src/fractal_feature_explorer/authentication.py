@@ -50,12 +50,28 @@ def _verify_authentication(config: ProductionConfig):
                 raise FractalUserNonVerifiedException()
             st.session_state[f"{Scope.PRIVATE}:fractal-email"] = email_address
             st.session_state[f"{Scope.PRIVATE}:fractal-token"] = token
+            st.session_state[f"{Scope.PRIVATE}:fractal-superuser"] = response_body.get(
+                "is_superuser", False
+            )
         else:
             msg = f"Could not obtain Fractal user information from {current_user_url}."
             logger.info(msg)
             raise ValueError(msg)
 
 
+def is_cache_admin() -> bool:
+    """Check if the user can manage the caches (see `cache_admin_page`).
+
+    In production deployments, only Fractal superusers are cache admins.
+    """
+    config = get_config()
+    if not config.cache_admin_page:
+        return False
+    if config.deployment_type == "local":
+        return True
+    return st.session_state.get(f"{Scope.PRIVATE}:fractal-superuser", False)
+
+
 def verify_authentication():
     config = get_config()
     if config.deployment_type == "local":
@@ -1,10 +1,12 @@
 """CLI for the Fractal Feature Explorer."""
 
+import argparse
+from pathlib import Path
+
 import uvicorn
 
 
-def cli():
-    """Run the Fractal Feature Explorer CLI."""
+def _serve(args: argparse.Namespace):
     uvicorn.run(
         "fractal_feature_explorer.app:app",
         host="localhost",
@@ -12,5 +14,135 @@ def cli():
     )
 
 
+def _index(args: argparse.Namespace):
+    # Imported here, so that the server command does not load the app modules
+    from fractal_feature_explorer.utils.ngio_io_caches import is_http_url
+    from fractal_feature_explorer.utils.tables_catalog import index_plate
+
+    for plate_url in args.plate_urls:
+        plate_url = plate_url.rstrip("/")
+        if not is_http_url(plate_url):
+            plate_url = str(Path(plate_url).expanduser().resolve())
+        path = index_plate(plate_url, fractal_token=args.fractal_token)
+        print(f"Manifest of {plate_url} written to {path}")
+
+
+def _warm(args: argparse.Namespace):
+    from fractal_feature_explorer.config import get_config
+    from fractal_feature_explorer.pages.setup_page._cache_warming import (
+        WarmStep,
+        warm_plates,
+    )
+    from fractal_feature_explorer.utils.common import set_default_fractal_token
+    from fractal_feature_explorer.utils.ngio_io_caches import is_http_url
+
+    config = get_config()
+    if config.table_disk_cache_dir is None and config.http_disk_cache_dir is None:
+        print(
+            "Warning: no disk cache is configured (`table_disk_cache_dir`, "
+            "`http_disk_cache_dir`), the warmed tables are not kept after exit. "
+            "Use the `preload` config to warm the caches of the server."
+        )
+
+    plate_urls = []
+    for plate_url in args.plate_urls:
+        plate_url = plate_url.rstrip("/")
+        if not is_http_url(plate_url):
+            plate_url = str(Path(plate_url).expanduser().resolve())
+        plate_urls.append(plate_url)
+
+    def _progress(step: WarmStep):
+        if step.error is None:
+            print(f"Warmed {step.name} in {step.seconds:.2f}s")
+        else:
+            print(f"Could not warm {step.name}: {step.error}")
+
+    set_default_fractal_token(args.fractal_token)
+    steps = warm_plates(plate_urls, args.table_names, progress=_progress)
+    if any(step.error is not None for step in steps):
+        raise SystemExit(1)
+
+
+def _consolidate(args: argparse.Namespace):
+    from fractal_feature_explorer.utils.consolidated_metadata import consolidate_plate
+
+    for plate_path in args.plate_paths:
+        plate_path = str(Path(plate_path).expanduser().resolve())
+        consolidate_plate(plate_path)
+        print(f"Metadata of {plate_path} consolidated")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="explorer", description="Fractal Feature Explorer."
+    )
+    parser.set_defaults(func=_serve)
+    subparsers = parser.add_subparsers(title="commands")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the dashboard (default).")
+    serve_parser.set_defaults(func=_serve)
+
+    index_parser = subparsers.add_parser(
+        "index",
+        help="Write the manifest of plates, to speed up their setup.",
+        description=(
+            "Write a manifest listing the images and tables of each plate. "
+            "Manifests are written to `plate_index_dir` if it is set in the "
+            "config, and next to the plate otherwise."
+        ),
+    )
+    index_parser.add_argument("plate_urls", nargs="+", metavar="plate_url")
+    index_parser.add_argument(
+        "--fractal-token", default=None, help="Token used to read remote plates."
+    )
+    index_parser.set_defaults(func=_index)
+
+    warm_parser = subparsers.add_parser(
+        "warm",
+        help="Load plates and feature tables in the shared caches.",
+        description=(
+            "Run the setup page loaders for the plates (and feature tables), "
+            "reporting the progress and timings, so that the tables are in the "
+            "disk caches (`table_disk_cache_dir`, `http_disk_cache_dir`) shared "
+            "with the server. Use the `preload` config to warm the in-memory "
+            "caches of the server at start."
+        ),
+    )
+    warm_parser.add_argument(
+        "--plates", nargs="+", required=True, dest="plate_urls", metavar="plate_url"
+    )
+    warm_parser.add_argument(
+        "--table",
+        action="append",
+        default=[],
+        dest="table_names",
+        metavar="table_name",
+        help="Feature table to load, can be repeated.",
+    )
+    warm_parser.add_argument(
+        "--fractal-token", default=None, help="Token used to read remote plates."
+    )
+    warm_parser.set_defaults(func=_warm)
+
+    consolidate_parser = subparsers.add_parser(
+        "consolidate",
+        help="Consolidate the zarr metadata of local plates.",
+        description=(
+            "Write the consolidated zarr metadata of each plate, so that remote "
+            "plates are opened with a single metadata request. Run it again "
+            "after modifying a plate (e.g. adding tables)."
+        ),
+    )
+    consolidate_parser.add_argument("plate_paths", nargs="+", metavar="plate_path")
+    consolidate_parser.set_defaults(func=_consolidate)
+    return parser
+
+
+def cli():
+    """Run the Fractal Feature Explorer CLI."""
+    args = _build_parser().parse_args()
+    args.func(args)
+
+
 if __name__ == "__main__":
     cli()
@@ -1,5 +1,9 @@
 import functools
+import inspect
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
 from pathlib import Path
 from typing import Annotated, Literal
@@ -8,6 +12,8 @@ import streamlit as st
 import toml
 from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 from streamlit.logger import get_logger
+from streamlit.runtime.caching.cache_type import CacheType
+from streamlit.runtime.caching.cache_utils import _make_value_key
 
 logger = get_logger(__name__)
 
@@ -16,12 +22,50 @@ def remove_trailing_slash(value: str) -> str:
     return value.rstrip("/")
 
 
+class PreloadConfig(BaseModel):
+    """Plates (and their feature tables) loaded in the caches at server start.
+
+    Only available in local deployments, see `preload_plates`.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+    plates: list[Annotated[str, AfterValidator(remove_trailing_slash)]]
+    tables: list[str] = Field(default_factory=list)
+
+
 class BaseConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
     deployment_type: Literal["local", "production"]
     allow_local_paths: bool
     cache_ttl: float | timedelta | str | None = None
     cache_max_entries: int | None = None
+    max_concurrent_plates: int = 8
+    max_concurrent_images: int = 32
+    async_max_concurrency: int = 32
+    async_max_workers: int = 32
+    http_pool_size: int = 100
+    http_keepalive_timeout: float = 30.0
+    http_connect_timeout: float = 30.0
+    http_read_timeout: float = 300.0
+    http_max_pools: int = 64
+    http_disk_cache_dir: str | None = None
+    http_disk_cache_max_bytes: int = 10 * 1024**3
+    lazy_feature_table: bool = False
+    compact_feature_table: bool = False
+    plate_index_dir: str | None = None
+    plate_manifest_max_age: float | None = 24 * 3600.0
+    use_consolidated_metadata: bool = True
+    table_disk_cache_dir: str | None = None
+    table_disk_cache_max_bytes: int = 20 * 1024**3
+    source_fingerprint_ttl: float = 10.0
+    access_check_ttl: float = 60.0
+    single_flight_timeout: float | None = 600.0
+    cache_max_bytes: int | None = None
+    cache_function_max_bytes: dict[str, int] = Field(default_factory=dict)
+    cache_compress_after: float | None = None
+    cache_compression: Literal["lz4", "zstd"] = "zstd"
+    cache_admin_page: bool = False
+    metrics_endpoint: bool = False
 
 
 class LocalConfig(BaseConfig):
@@ -30,6 +74,8 @@ class LocalConfig(BaseConfig):
         Field(default_factory=list)
     )
     allow_local_paths: bool = True
+    metrics_endpoint: bool = True
+    preload: list[PreloadConfig] = Field(default_factory=list)
 
 
 class ProductionConfig(BaseConfig):
@@ -81,31 +127,380 @@ def get_config() -> LocalConfig | ProductionConfig:
     return config
 
 
-def st_cache_data_wrapper(func):
+def _prepare_cached_call(
+    func,
+    args: tuple,
+    kwargs: dict,
+    source: str | None = None,
+    source_path: str = "",
+    authorize: str | None = None,
+) -> tuple[tuple, dict, tuple[str | None, ...] | None, str | None]:
+    """Prepare the arguments of a call to a cached function.
+
+    - If `source` is given (the name of the argument holding the source URL,
+      or list of URLs), the fingerprints of the `source_path` nodes relative
+      to the URLs are returned, to be part of the cache key
+      (see `source_fingerprint`).
+    - If `authorize` is given (the name of the URL argument), the access of
+      the user to the URLs is checked (see `check_access`), and the
+      `fractal_token` argument is returned separately, so that it is not part
+      of the cache key and the entries are shared by all the users.
+
+    Returns the arguments, the fingerprints and the fractal token to pass.
+    """
+    # Imported here, these modules depend on the cached loaders
+    from fractal_feature_explorer.utils.common import get_fractal_token
+    from fractal_feature_explorer.utils.ngio_io_caches import check_access
+    from fractal_feature_explorer.utils.source_fingerprint import sources_fingerprints
+
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    fractal_token = bound.arguments.get("fractal_token", get_fractal_token())
+
+    def _urls(name: str) -> list[str]:
+        urls = bound.arguments[name]
+        return [urls] if isinstance(urls, str) else list(urls)
+
+    fingerprints = None
+    if source is not None:
+        path = source_path.format(**bound.arguments)
+        fingerprints = tuple(
+            sources_fingerprints(_urls(source), path, fractal_token=fractal_token)
+        )
+
+    private_token = None
+    if authorize is not None:
+        for url in _urls(authorize):
+            check_access(url, fractal_token=fractal_token)
+        if "fractal_token" in bound.arguments:
+            bound.arguments["fractal_token"] = None
+            private_token = fractal_token
+    return bound.args, bound.kwargs, fingerprints, private_token
+
+
+def _call_with_token(func, args: tuple, kwargs: dict, fractal_token: str | None):
+    """Call the function, restoring the token removed from the cache key.
+
+    This is only called on cache misses, the computation time is recorded in
+    the cache metrics.
+    """
+    # Imported here, the utils package depends on the cached loaders
+    from fractal_feature_explorer.utils.cache_metrics import record_compute
+
+    if fractal_token is not None:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.arguments["fractal_token"] = fractal_token
+        args, kwargs = bound.args, bound.kwargs
+
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        record_compute(func.__name__, time.perf_counter() - start, error=True)
+        raise
+    record_compute(func.__name__, time.perf_counter() - start)
+    return result
+
+
+def _uses_memory_cache(func) -> bool:
+    """Check if the entries of a function are kept in the byte-budgeted cache.
+
+    With the cache page enabled, all the entries are kept there (without byte
+    budget unless `cache_max_bytes` is set), as the streamlit caches do not
+    track the plate of their entries and can not be evicted by plate.
+    """
+    config = get_config()
+    return (
+        config.cache_max_bytes is not None
+        or func.__name__ in config.cache_function_max_bytes
+        or config.cache_admin_page
+    )
+
+
+def _call_sources(
+    func, args: tuple, kwargs: dict
+) -> tuple[tuple[str, ...], str | None]:
+    """Get the URLs and the table name read by a call to a cached function.
+
+    The URLs are the values of the `*url` and `*urls` arguments.
+    """
+    signature = inspect.signature(func)
+    kwargs = {k: v for k, v in kwargs.items() if k in signature.parameters}
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        return (), None
+
+    urls: list[str] = []
+    for name, value in bound.arguments.items():
+        if name.endswith("url") and isinstance(value, str):
+            urls.append(value)
+        elif name.endswith("urls") and isinstance(value, list | tuple):
+            urls.extend(url for url in value if isinstance(url, str))
+    table_name = bound.arguments.get("table_name")
+    if not isinstance(table_name, str):
+        table_name = None
+    return tuple(urls), table_name
+
+
+# Key of a cached call (without its source fingerprint) -> fingerprint cached
+# (bounded, the least recently used calls are forgotten first)
+_cached_fingerprints: OrderedDict[str, tuple[str | None, ...]] = OrderedDict()
+_cached_fingerprints_lock = threading.Lock()
+_MAX_CACHED_FINGERPRINTS = 100_000
+
+
+def _call_key(cache_type: CacheType, cached_func, args: tuple, kwargs: dict) -> str:
+    value_key = _make_value_key(cache_type, cached_func, args, kwargs, hash_funcs=None)
+    return f"{cached_func.__module__}.{cached_func.__qualname__}:{value_key}"
+
+
+def _evict_stale_entry(
+    cache_type: CacheType,
+    cached_func,
+    args: tuple,
+    kwargs: dict,
+    in_memory_cache: bool = False,
+) -> None:
+    """Evict the entry of the same call cached with another source fingerprint.
+
+    The fingerprint is part of the cache key, so without this the entries of
+    the previous versions of a source would stay cached until their TTL (or
+    forever, without `cache_ttl` and `cache_max_entries`).
+    """
+    fingerprint = kwargs["source_fingerprint"]
+    call_key = _call_key(
+        cache_type, cached_func, args, {**kwargs, "source_fingerprint": None}
+    )
+    with _cached_fingerprints_lock:
+        previous = _cached_fingerprints.get(call_key)
+        _cached_fingerprints[call_key] = fingerprint
+        _cached_fingerprints.move_to_end(call_key)
+        while len(_cached_fingerprints) > _MAX_CACHED_FINGERPRINTS:
+            _cached_fingerprints.popitem(last=False)
+    if previous is None or previous == fingerprint:
+        return
+
+    stale_kwargs = {**kwargs, "source_fingerprint": previous}
+    if in_memory_cache:
+        # Imported here, the utils package depends on the cached loaders
+        from fractal_feature_explorer.utils.memory_cache import get_memory_cache
+
+        stale_key = _call_key(cache_type, cached_func, args, stale_kwargs)
+        get_memory_cache().evict(cached_func.__name__, stale_key)
+    else:
+        cached_func.clear(*args, **stale_kwargs)
+    logger.info(f"Evicted a stale entry of {cached_func.__name__} (source changed).")
+
+
+_single_flight_warned = False
+
+
+def _warn_no_single_flight(error: Exception) -> None:
+    """Warn (once) that concurrent misses are not deduplicated."""
+    global _single_flight_warned
+    if _single_flight_warned:
+        return
+    _single_flight_warned = True
+    logger.warning(
+        f"Could not compute the cache key of a call ({error!r}), concurrent "
+        "calls to the cached loaders are not deduplicated. This is expected for "
+        "unhashable arguments, otherwise check the streamlit version."
+    )
+
+
+def _cached_call(
+    cache_type: CacheType,
+    cached_func,
+    args: tuple,
+    kwargs: dict,
+    in_memory_cache: bool = False,
+):
+    """Call a cached function, waiting for a concurrent call with the same key.
+
+    The key is the streamlit cache key of the call, so that concurrent misses
+    of the same entry are computed once (see `single_flight`). The callers of
+    `st.cache_data` functions get their own copy of the value from the cache.
+
+    If `in_memory_cache` is True, `cached_func` is not cached by streamlit,
+    and its entries are kept in the byte-budgeted cache (see `memory_cache`).
+    """
+    # Imported here, the utils package depends on the cached loaders
+    from fractal_feature_explorer.utils.cache_metrics import record_call
+    from fractal_feature_explorer.utils.memory_cache import (
+        copy_value,
+        get_memory_cache,
+    )
+    from fractal_feature_explorer.utils.single_flight import single_flight
+
+    record_call(cached_func.__name__)
+    try:
+        key = _call_key(cache_type, cached_func, args, kwargs)
+    except Exception as e:
+        if in_memory_cache:
+            raise
+        # Unhashable arguments, or a change of the private streamlit API:
+        # let streamlit report the error, without deduplication
+        _warn_no_single_flight(e)
+        return cached_func(*args, **kwargs)
+    if kwargs.get("source_fingerprint") is not None:
+        _evict_stale_entry(cache_type, cached_func, args, kwargs, in_memory_cache)
+    timeout = get_config().single_flight_timeout
+    if not in_memory_cache:
+        return single_flight(
+            key,
+            lambda: cached_func(*args, **kwargs),
+            timeout=timeout,
+            share_result=cache_type is CacheType.RESOURCE,
+        )
+
+    cache = get_memory_cache()
+    func_name = cached_func.__name__
+    found, value = cache.get(func_name, key)
+    if not found:
+
+        def _load():
+            value = cached_func(*args, **kwargs)
+            urls, table_name = _call_sources(cached_func, args, kwargs)
+            cache.put(func_name, key, value, urls=urls, table_name=table_name)
+            return value
+
+        value = single_flight(key, _load, timeout=timeout)
+    if cache_type is CacheType.RESOURCE:
+        return value
+    value = copy_value(value)
+    cache.track_copy(func_name, key, value)
+    return value
+
+
+def st_cache_data_wrapper(
+    func=None,
+    *,
+    source: str | None = None,
+    source_path: str = "",
+    authorize: str | None = None,
+):
     """Wrapper around st.cache_data to set a default ttl.
 
     Supports per-user cache busting via the 'setup:cache_buster' session state key.
     Incrementing that value in a user's session invalidates their cached entries
     without affecting other users.
+
+    If `source` is given (the name of the URL argument), the fingerprint of the
+    source is part of the cache key, so that an entry is reloaded as soon
+    as its source changes. If `authorize` is given (the name of the URL
+    argument), the entries are shared by all users, and the access of each
+    user to the URL is checked instead. See `_prepare_cached_call`.
+
+    Concurrent calls with the same cache key are computed once, the other
+    callers wait for the result (at most `single_flight_timeout` seconds).
+
+    If `cache_max_bytes` is set, or the function has its own budget in
+    `cache_function_max_bytes`, the entries are kept in the byte-budgeted
+    cache instead of the streamlit cache (see `memory_cache`).
     """
+    if func is None:
+        return functools.partial(
+            st_cache_data_wrapper,
+            source=source,
+            source_path=source_path,
+            authorize=authorize,
+        )
     config = get_config()
+    in_memory_cache = _uses_memory_cache(func)
 
-    @st.cache_data(ttl=config.cache_ttl, max_entries=config.cache_max_entries)
+    # Arguments starting with an underscore are not hashed by streamlit
     @functools.wraps(func)
-    def _cached(*args, cache_buster: int = 0, **kwargs):
-        return func(*args, **kwargs)
+    def _cached(
+        *args,
+        cache_buster: int = 0,
+        source_fingerprint=None,
+        _fractal_token: str | None = None,
+        **kwargs,
+    ):
+        return _call_with_token(func, args, kwargs, _fractal_token)
+
+    if not in_memory_cache:
+        _cached = st.cache_data(
+            ttl=config.cache_ttl, max_entries=config.cache_max_entries
+        )(_cached)
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         cb = st.session_state.get("setup:cache_buster", 0)
-        return _cached(*args, cache_buster=cb, **kwargs)
+        fingerprint, fractal_token = None, None
+        if source is not None or authorize is not None:
+            args, kwargs, fingerprint, fractal_token = _prepare_cached_call(
+                func, args, kwargs, source, source_path, authorize
+            )
+        kwargs = {
+            "cache_buster": cb,
+            "source_fingerprint": fingerprint,
+            "_fractal_token": fractal_token,
+            **kwargs,
+        }
+        return _cached_call(CacheType.DATA, _cached, args, kwargs, in_memory_cache)
 
     return wrapper
 
 
-def st_cache_resource_wrapper(func):
-    """Wrapper around st.cache_resource to set a default ttl."""
+def st_cache_resource_wrapper(
+    func=None,
+    *,
+    source: str | None = None,
+    source_path: str = "",
+    authorize: str | None = None,
+    max_entries: int | None = None,
+):
+    """Wrapper around st.cache_resource to set a default ttl.
+
+    `source` and `authorize` are supported as in `st_cache_data_wrapper`.
+    `max_entries` bounds the entries of this function below the
+    `cache_max_entries` of the config (if set).
+    """
+    if func is None:
+        return functools.partial(
+            st_cache_resource_wrapper,
+            source=source,
+            source_path=source_path,
+            authorize=authorize,
+            max_entries=max_entries,
+        )
     config = get_config()
-    return st.cache_resource(
-        ttl=config.cache_ttl, max_entries=config.cache_max_entries
-    )(func)
+    in_memory_cache = _uses_memory_cache(func)
+    if config.cache_max_entries is not None:
+        max_entries = min(
+            max_entries or config.cache_max_entries, config.cache_max_entries
+        )
+
+    @functools.wraps(func)
+    def _cached(
+        *args, source_fingerprint=None, _fractal_token: str | None = None, **kwargs
+    ):
+        return _call_with_token(func, args, kwargs, _fractal_token)
+
+    if not in_memory_cache:
+        _cached = st.cache_resource(ttl=config.cache_ttl, max_entries=max_entries)(
+            _cached
+        )
+    elif max_entries is not None:
+        # Imported here, the utils package depends on the cached loaders
+        from fractal_feature_explorer.utils.memory_cache import get_memory_cache
+
+        get_memory_cache().set_max_entries(_cached.__name__, max_entries)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        fingerprint, fractal_token = None, None
+        if source is not None or authorize is not None:
+            args, kwargs, fingerprint, fractal_token = _prepare_cached_call(
+                func, args, kwargs, source, source_path, authorize
+            )
+        kwargs = {
+            "source_fingerprint": fingerprint,
+            "_fractal_token": fractal_token,
+            **kwargs,
+        }
+        return _cached_call(CacheType.RESOURCE, _cached, args, kwargs, in_memory_cache)
+
+    return wrapper
@@ -4,6 +4,10 @@ import ngio
 import streamlit as st
 
 import fractal_feature_explorer
+from fractal_feature_explorer.authentication import (
+    is_cache_admin,
+    verify_authentication,
+)
 from fractal_feature_explorer.config import get_config
 
 
@@ -69,6 +73,13 @@ def main():
     if config.deployment_type == "production":
         user_info_page = st.Page("pages/info.py", title="Info", icon=":material/info:")
         pages.append(user_info_page)
+    # The superuser status is only known once the user is authenticated
+    verify_authentication()
+    if is_cache_admin():
+        cache_page = st.Page(
+            "pages/cache_page.py", title="Cache", icon=":material/storage:"
+        )
+        pages.append(cache_page)
 
     pg = st.navigation(pages)
 
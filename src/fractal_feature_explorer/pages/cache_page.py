@@ -0,0 +1,72 @@
+"""Fractal Feature Explorer - Cache Admin Page."""
+
+import polars as pl
+import streamlit as st
+from streamlit.logger import get_logger
+
+from fractal_feature_explorer.authentication import (
+    is_cache_admin,
+    verify_authentication,
+)
+from fractal_feature_explorer.utils.cache_admin import (
+    evict_plate,
+    list_cache_entries,
+)
+
+logger = get_logger(__name__)
+
+
+def cache_entries_summary(entries: pl.DataFrame) -> pl.DataFrame:
+    """Group the cache entries by plate URL, table name and function."""
+    return (
+        entries.group_by(["plate_url", "table_name", "function", "cache"])
+        .agg(
+            pl.len().alias("entries"),
+            (pl.col("size_bytes").sum() / 1024**2).round(2).alias("size_mb"),
+            pl.col("age_seconds").max().round(0).alias("oldest_age_s"),
+            pl.col("idle_seconds").min().round(0).alias("last_access_s_ago"),
+            pl.col("hits").sum().alias("hits"),
+        )
+        .sort(["plate_url", "table_name", "function"], nulls_last=True)
+    )
+
+
+def main():
+    verify_authentication()
+    if not is_cache_admin():
+        st.error("The cache page is restricted to the cache admins.")
+        st.stop()
+
+    entries = list_cache_entries()
+    plate_urls = entries["plate_url"].drop_nulls().unique().sort().to_list()
+    plate_url = st.selectbox(
+        "Plate URL",
+        options=plate_urls,
+        index=None,
+        help="Select the plate whose cached entries should be evicted.",
+    )
+    if st.button(
+        "Evict plate entries",
+        disabled=plate_url is None,
+        icon=":material/delete:",
+        help="Remove all the cached entries read from the selected plate, "
+        "for all the users. They are reloaded on the next access.",
+    ):
+        assert plate_url is not None
+        evicted = evict_plate(plate_url)
+        st.success(f"Evicted {sum(evicted.values())} cache entries of {plate_url}.")
+        entries = list_cache_entries()
+
+    if entries.is_empty():
+        st.write("No cache entries found.")
+        st.stop()
+
+    st.caption(
+        "Entries read from several plates (e.g. the plate setup table) are "
+        "listed once per plate."
+    )
+    st.dataframe(cache_entries_summary(entries), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -39,7 +39,9 @@ def build_feature_frame(feature_table: pl.LazyFrame) -> FeatureFrame:
             "image_name",
         ]:
             cathegorical.append(name)
-        elif dtype == pl.UInt8() or dtype == pl.String() or dtype == pl.Categorical():
+        elif dtype == pl.UInt8() or dtype == pl.String():
+            cathegorical.append(name)
+        elif isinstance(dtype, pl.Categorical | pl.Enum):
             cathegorical.append(name)
         elif dtype == pl.Boolean():
             cathegorical.append(name)
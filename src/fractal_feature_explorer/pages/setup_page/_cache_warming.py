@@ -0,0 +1,135 @@
+"""Warm the shared caches with the plates of a screen.
+
+The same loaders as the setup page are run (plate setup table, images index,
+tables catalog and feature tables, with all the images and all the columns
+selected), so that the first user opening the plates gets cache hits instead
+of waiting for the cold load. This is run by `explorer warm`, and at server
+start for the plates listed in the `preload` config.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+from streamlit.logger import get_logger
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.pages.setup_page._plate_advanced_selection import (
+    into_images_df,
+)
+from fractal_feature_explorer.pages.setup_page._plate_mode_setup import (
+    build_plate_setup_df,
+)
+from fractal_feature_explorer.pages.setup_page._tables_io import (
+    collect_feature_table_from_plates,
+)
+from fractal_feature_explorer.utils.common import get_fractal_token
+from fractal_feature_explorer.utils.ngio_io_caches import _get_plate_images_index
+from fractal_feature_explorer.utils.tables_catalog import get_plate_catalog
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WarmStep:
+    """A loader run while warming the caches."""
+
+    name: str
+    seconds: float
+    error: str | None = None
+
+
+def _log_step(step: WarmStep) -> None:
+    if step.error is None:
+        logger.info(f"Warmed {step.name} in {step.seconds:.2f}s.")
+    else:
+        logger.error(f"Could not warm {step.name}: {step.error}")
+
+
+def warm_plates(
+    plate_urls: list[str],
+    table_names: list[str] | None = None,
+    progress: Callable[[WarmStep], None] = _log_step,
+) -> list[WarmStep]:
+    """Load the plates and their feature tables in the shared caches.
+
+    Errors are not raised, each step is reported to `progress` with its
+    timing or its error, and all the steps are returned.
+    """
+    steps: list[WarmStep] = []
+
+    def _run(name: str, func: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = func()
+            error = None
+        except Exception as e:
+            result, error = None, str(e) or type(e).__name__
+        step = WarmStep(name=name, seconds=time.perf_counter() - start, error=error)
+        steps.append(step)
+        progress(step)
+        return result
+
+    def _load_plate_setup() -> pl.DataFrame:
+        plate_setup_df = build_plate_setup_df(plate_urls)
+        if plate_setup_df.is_empty():
+            # The plates that could not be opened are logged and skipped
+            raise ValueError("No images found in the plates.")
+        return plate_setup_df
+
+    plate_setup_df = _run("plate setup table", _load_plate_setup)
+    if plate_setup_df is None:
+        return steps
+
+    fractal_token = get_fractal_token()
+    for plate_url in plate_setup_df["plate_url"].unique().sort().to_list():
+        _run(
+            f"images index of {plate_url}",
+            lambda url=plate_url: _get_plate_images_index(
+                url, fractal_token=fractal_token
+            ),
+        )
+        _run(
+            f"tables catalog of {plate_url}",
+            lambda url=plate_url: get_plate_catalog(url),
+        )
+
+    # The images table of the default selection (all the images), as built
+    # by the setup page, so that the disk cache keys of the tables match
+    images_setup = into_images_df(plate_setup_df)
+
+    def _load_feature_table(table_name: str) -> None:
+        feature_table = collect_feature_table_from_plates(images_setup, table_name)
+        if feature_table is None:
+            raise ValueError(f"Feature table `{table_name}` not found in the plates.")
+
+    for table_name in table_names or []:
+        _run(
+            f"feature table {table_name}",
+            lambda name=table_name: _load_feature_table(name),
+        )
+    return steps
+
+
+def preload_plates() -> None:
+    """Warm the caches with the plates listed in the `preload` config.
+
+    The plates are loaded without a fractal token, so the warmed entries are
+    the ones used by the sessions without a token. This is why preloading is
+    only available in local deployments (local paths and public URLs): in
+    production every session has its own token, and the plates that require
+    one can not be loaded at server start.
+    """
+    config = get_config()
+    if config.deployment_type != "local":
+        return
+    for preload in config.preload:
+        start = time.perf_counter()
+        steps = warm_plates(preload.plates, preload.tables)
+        num_errors = sum(step.error is not None for step in steps)
+        logger.info(
+            f"Preloaded {len(preload.plates)} plates in "
+            f"{time.perf_counter() - start:.2f}s ({num_errors} errors)."
+        )
@@ -343,7 +343,7 @@ def filter_based_on_condition(plate_setup_df: pl.DataFrame) -> pl.DataFrame:
 def into_images_df(plate_setup_df: pl.DataFrame) -> pl.DataFrame:
     """Convert the plate setup DataFrame into a DataFrame of images."""
     plate_setup_df = plate_setup_df.group_by(
-        ["plate_url", "row", "column", "path_in_well"]
+        ["plate_url", "row", "column", "path_in_well"], maintain_order=True
     ).all()
     for col in plate_setup_df.columns:
         df_c = plate_setup_df[col]
@@ -4,24 +4,31 @@ import polars as pl
 import streamlit as st
 from streamlit.logger import get_logger
 
+from fractal_feature_explorer.config import get_config, st_cache_data_wrapper
 from fractal_feature_explorer.pages.setup_page._plate_advanced_selection import (
     advanced_plate_selection_component,
 )
 from fractal_feature_explorer.pages.setup_page._tables_io import (
     collect_feature_table_from_images,
     collect_feature_table_from_plates,
+    count_feature_table_from_plates,
+    list_feature_table_columns,
     list_images_tables,
     list_plate_tables,
+    scan_feature_table_from_plates,
 )
 from fractal_feature_explorer.pages.setup_page._utils import (
-    extras_from_url,
     sanify_and_validate_url,
 )
-from fractal_feature_explorer.utils.common import Scope
+from fractal_feature_explorer.utils.common import Scope, get_fractal_token
+from fractal_feature_explorer.utils.event_loop import run_coroutine
 from fractal_feature_explorer.utils.ngio_io_caches import (
+    _get_ome_zarr_plate,
     get_ome_zarr_plate,
 )
+from fractal_feature_explorer.utils.plate_manifest import read_plate_manifest
 from fractal_feature_explorer.utils.st_components import (
+    multiselect_component,
     pills_component,
     selectbox_component,
 )
@@ -43,7 +50,7 @@ def user_plate_url_input_component():
     logger.info(f"Global URLs: {global_urls}")
 
     if f"{Scope.SETUP}:plate_setup:urls" not in st.session_state:
-        st.session_state[f"{Scope.SETUP}:plate_setup:urls"] = set()
+        st.session_state[f"{Scope.SETUP}:plate_setup:urls"] = []
 
     new_url = st.text_input("Plate URL")
     if st.button("Add Plate URL", icon="➕"):
@@ -53,7 +60,8 @@ def user_plate_url_input_component():
             try:
                 _ = get_ome_zarr_plate(new_url)
                 current_urls = st.session_state[f"{Scope.SETUP}:plate_setup:urls"]
-                current_urls.add(new_url)
+                if new_url not in current_urls:
+                    current_urls.append(new_url)
                 st.session_state[f"{Scope.SETUP}:plate_setup:urls"] = current_urls
             except Exception as e:
                 error_msg = f"Error loading plate at {new_url} \n{e}"
@@ -64,40 +72,96 @@ def user_plate_url_input_component():
     return local_urls
 
 
+async def _list_plates_images_paths(
+    plate_urls: list[str],
+    fractal_token: str | None = None,
+    max_concurrency: int = 8,
+) -> list[list[str]]:
+    """Open the plates and list their images paths concurrently.
+
+    The images paths are read from the plate manifest instead, if a fresh one
+    is available. At most `max_concurrency` plates are processed at the same time.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _list_images_paths(plate_url: str) -> list[str]:
+        async with semaphore:
+            # The fractal token is passed explicitly, since the session state
+            # is not available outside of the script thread
+            manifest = await asyncio.to_thread(
+                read_plate_manifest, plate_url, fractal_token=fractal_token
+            )
+            if manifest is not None:
+                return manifest["images_paths"]
+            plate = await asyncio.to_thread(
+                _get_ome_zarr_plate, plate_url, fractal_token=fractal_token
+            )
+            return await plate.images_paths_async()
+
+    return await asyncio.gather(*(_list_images_paths(url) for url in plate_urls))
+
+
+@st_cache_data_wrapper(source="plate_urls")
+def _build_plate_setup_df(
+    plate_urls: list[str],
+    fractal_token: str | None = None,
+) -> pl.DataFrame:
+    """Build the plate setup DataFrame from a list of validated plate URLs.
+
+    The images URLs and extras are derived from the plate metadata with
+    vectorized string operations.
+    """
+    config = get_config()
+    plates_images_paths = run_coroutine(
+        _list_plates_images_paths(
+            plate_urls,
+            fractal_token=fractal_token,
+            max_concurrency=config.max_concurrent_plates,
+        )
+    )
+
+    plate_setup_df = pl.DataFrame(
+        {"plate_url": plate_urls, "path_in_plate": plates_images_paths},
+        schema={"plate_url": pl.Utf8(), "path_in_plate": pl.List(pl.Utf8())},
+    ).explode("path_in_plate")
+    plate_setup_df = plate_setup_df.drop_nulls("path_in_plate")
+
+    # Same sanitization as `sanify_http_url`, applied only to HTTP plates
+    path_in_plate = (
+        pl.when(pl.col("plate_url").str.contains(r"^https?://"))
+        .then(pl.col("path_in_plate").str.replace_all(" ", "%20", literal=True))
+        .otherwise(pl.col("path_in_plate"))
+    )
+    path_parts = pl.col("path_in_plate").str.split("/")
+    plate_setup_df = plate_setup_df.with_columns(path_in_plate).select(
+        pl.col("plate_url"),
+        pl.col("plate_url").str.split("/").list.last().alias("plate_name"),
+        path_parts.list.get(0).alias("row"),
+        path_parts.list.get(1).cast(pl.Int64).alias("column"),
+        path_parts.list.get(2).alias("path_in_well"),
+        pl.concat_str(["plate_url", "path_in_plate"], separator="/").alias("image_url"),
+    )
+    return plate_setup_df
+
+
 def build_plate_setup_df(plate_urls: list[str]) -> pl.DataFrame:
-    plates = []
-    for plate_url in plate_urls:
+    """Build the plate setup DataFrame, cached on the list of plate URLs.
+
+    Only the plate root URLs are validated, outside of the cached builder so
+    that the validation errors are shown on every run. The order of the plates
+    is kept.
+    """
+    valid_plate_urls = []
+    for plate_url in dict.fromkeys(plate_urls):
         plate_url = sanify_and_validate_url(plate_url)
         if plate_url is None:
             continue
-        plate = get_ome_zarr_plate(plate_url)
-        images_paths = asyncio.run(plate.images_paths_async())
-        for path_in_plate in images_paths:
-            image_url = f"{plate_url}/{path_in_plate}"
-            image_url = sanify_and_validate_url(image_url)
-            if image_url is None:
-                continue
-            extras = extras_from_url(image_url)
-            plates.append(
-                {
-                    "image_url": image_url,
-                    "plate_url": plate_url,
-                    **extras,
-                }
-            )
+        valid_plate_urls.append(plate_url)
 
-    plate_setup_df = pl.DataFrame(
-        plates,
-        schema={
-            "plate_url": pl.Utf8(),
-            "plate_name": pl.Utf8(),
-            "row": pl.Utf8(),
-            "column": pl.Int64(),
-            "path_in_well": pl.Utf8(),
-            "image_url": pl.Utf8(),
-        },
+    return _build_plate_setup_df(
+        list(dict.fromkeys(valid_plate_urls)),
+        fractal_token=get_fractal_token(),
     )
-    return plate_setup_df
 
 
 # ====================================================================
@@ -185,10 +249,36 @@ def _feature_table_selection_widget(
     return selected_table, mode
 
 
+def _feature_columns_selection_widget(
+    plate_setup_df: pl.DataFrame, table_name: str, mode: str
+) -> list[str] | None:
+    """Create a widget for selecting the feature columns to load.
+
+    Returns None if all the columns are selected.
+    """
+    feature_columns = list_feature_table_columns(plate_setup_df, table_name, mode=mode)
+    selected_columns = multiselect_component(
+        key=f"{Scope.SETUP}:feature_columns_selection:{table_name}",
+        label="Select Features to Load",
+        options=feature_columns,
+        help=(
+            "Only the selected features (and the label, row, column and "
+            "path_in_well keys) are loaded from the feature table."
+        ),
+    )
+    if len(selected_columns) == len(feature_columns):
+        return None
+    return [c for c in feature_columns if c in selected_columns]
+
+
 def load_feature_table(
     plate_setup_df: pl.DataFrame,
-) -> tuple[pl.DataFrame, str]:
-    """Load the feature table from the plate URLs."""
+) -> tuple[pl.DataFrame | pl.LazyFrame, str]:
+    """Load the feature table from the plate URLs.
+
+    If `lazy_feature_table` is set in the config, plate level tables are
+    returned as a lazy scan instead of being loaded in memory.
+    """
     plate_feature_tables = list_plate_tables(
         plate_setup_df, filter_types="feature_table"
     )
@@ -199,16 +289,26 @@ def load_feature_table(
     selected_table, mode = _feature_table_selection_widget(
         plate_feature_tables, image_feature_tables
     )
+    with st.expander("Features Selection", expanded=False):
+        columns = _feature_columns_selection_widget(
+            plate_setup_df, selected_table, mode=mode
+        )
 
     with st.spinner("Loading feature table...", show_time=True):
         if mode == "image":
             feature_table = collect_feature_table_from_images(
-                plate_setup_df, selected_table
+                plate_setup_df, selected_table, columns=columns
+            )
+            return feature_table, selected_table
+
+        if get_config().lazy_feature_table:
+            feature_table = scan_feature_table_from_plates(
+                plate_setup_df, selected_table, columns=columns
             )
             return feature_table, selected_table
 
         feature_table = collect_feature_table_from_plates(
-            plate_setup_df, selected_table
+            plate_setup_df, selected_table, columns=columns
         )
         if feature_table is None:
             st.error(f"Feature table `{selected_table}` not found in the plate URLs.")
@@ -219,12 +319,43 @@ def load_feature_table(
         return feature_table, selected_table
 
 
-def features_infos(feature_table: pl.DataFrame, name: str = "Feature Table"):
-    """Show the first few features in the feature table."""
+def compact_feature_table_component(feature_table: pl.DataFrame):
+    """Report the dtypes and memory of the compact feature table.
+
+    The tables are converted to compact dtypes by the cached loaders, the bytes
+    saved by each plate (or image) are logged when it is loaded.
+    """
+    report = pl.DataFrame(
+        {
+            "column": feature_table.columns,
+            "dtype": [str(dtype) for dtype in feature_table.dtypes],
+            "bytes": [feature_table[c].estimated_size() for c in feature_table.columns],
+        },
+        schema_overrides={"bytes": pl.Int64},
+    )
+    with st.expander("Compact Table Report", expanded=False):
+        total_mb = feature_table.estimated_size("mb")
+        st.write(f"The compact feature table uses `{total_mb:.1f}` MB.")
+        st.dataframe(report, hide_index=True)
+
+
+def features_infos(
+    feature_table: pl.DataFrame | pl.LazyFrame,
+    name: str = "Feature Table",
+    num_observations: int | None = None,
+):
+    """Show the first few features in the feature table.
+
+    The number of observations of a lazy feature table must be given, so that
+    the table is not collected just to count its rows.
+    """
+    if num_observations is None:
+        num_observations = feature_table.lazy().select(pl.len()).collect().item()
+    num_features = feature_table.lazy().collect_schema().len()
     st.write(
         f"Feature table: {name} correctly loaded. "
-        f"Contains `{len(feature_table)}` observations and "
-        f"`{len(feature_table.columns)}` features."
+        f"Contains `{num_observations}` observations and "
+        f"`{num_features}` features."
     )
 
 
@@ -243,7 +374,7 @@ def plate_mode_setup_component():
     local_urls = user_plate_url_input_component()
     logger.info(f"Local URLs: {local_urls}")
     urls = global_urls + list(local_urls)
-    urls = list(set(urls))
+    urls = list(dict.fromkeys(urls))
 
     if not urls:
         error_msg = "No URLs provided. Please provide at least one URL."
@@ -266,5 +397,10 @@ def plate_mode_setup_component():
 
     st.markdown("## Feature Table Selection")
     feature_table, table_name = load_feature_table(images_setup)
-    features_infos(feature_table, table_name)
+    if get_config().compact_feature_table and isinstance(feature_table, pl.DataFrame):
+        compact_feature_table_component(feature_table)
+    num_observations = None
+    if isinstance(feature_table, pl.LazyFrame):
+        num_observations = count_feature_table_from_plates(images_setup, table_name)
+    features_infos(feature_table, table_name, num_observations=num_observations)
     return feature_table.lazy(), table_name
@@ -1,72 +1,99 @@
 import asyncio
+import functools
+import hashlib
+import time
+from collections.abc import Callable
 from typing import Literal
 
 import polars as pl
 import streamlit as st
-from ngio.images._table_ops import (
-    concatenate_image_tables_as_async,
-    concatenate_image_tables_async,
-    list_image_tables_async,
-)
+from ngio import OmeZarrContainer
 from ngio.tables import FeatureTable
 from streamlit.logger import get_logger
 
-from fractal_feature_explorer.config import st_cache_data_wrapper
+from fractal_feature_explorer.config import (
+    get_config,
+    st_cache_data_wrapper,
+    st_cache_resource_wrapper,
+)
 from fractal_feature_explorer.pages.setup_page._utils import (
     extras_from_url,
     plate_name_from_url,
 )
 from fractal_feature_explorer.utils import (
+    Scope,
+    get_fractal_token,
     get_ome_zarr_container,
     get_ome_zarr_plate,
 )
+from fractal_feature_explorer.utils.disk_cache import hash_key
+from fractal_feature_explorer.utils.event_loop import (
+    run_coroutine,
+    to_thread_with_script_context,
+)
+from fractal_feature_explorer.utils.ngio_io_caches import (
+    _get_ome_zarr_container,
+    _get_ome_zarr_plate,
+    _get_plate_images_index,
+)
+from fractal_feature_explorer.utils.single_flight import single_flight
+from fractal_feature_explorer.utils.source_fingerprint import nodes_fingerprints
+from fractal_feature_explorer.utils.table_disk_cache import (
+    get_table_disk_cache,
+    read_cached_table,
+    write_cached_table,
+)
+from fractal_feature_explorer.utils.tables_catalog import (
+    query_images_tables,
+    query_plate_tables,
+)
 
 logger = get_logger(__name__)
 
+# Columns always loaded from a feature table, regardless of the column selection
+FEATURE_TABLE_KEY_COLUMNS = ("label", "row", "column", "path_in_well")
+
+# String columns repeated on every row, dictionary-encoded in compact mode
+COMPACT_CATEGORICAL_COLUMNS = (
+    "image_url",
+    "plate_name",
+    "row",
+    "path_in_well",
+    "reference_label",
+)
+
+# Assembled feature tables kept in memory (all users), the older ones are
+# read back from the disk cache
+ASSEMBLED_TABLES_MAX_ENTRIES = 8
+
+
+def _get_cache_buster() -> int:
+    """Get the cache buster of the user session (see `st_cache_data_wrapper`)."""
+    return st.session_state.get(f"{Scope.SETUP}:cache_buster", 0)
+
 
 def list_plate_tables(
     plate_setup_df: pl.DataFrame,
     filter_types: str = "condition_table",
     mode: Literal["all", "common"] = "common",
 ) -> list[str]:
-    """Collect existing tables from the plate URLs."""
-    plate_urls = plate_setup_df["plate_url"].unique().to_list()
-    plate_tables = {}
+    """Collect existing tables from the plate URLs.
 
-    for url in plate_urls:
-        logger.warning(f"Loading plate {url}...")
+    The tables are looked up in the (cached) tables catalog of each plate.
+    """
+    plate_urls = plate_setup_df["plate_url"].unique(maintain_order=True).to_list()
+    try:
+        plate_tables = query_plate_tables(
+            plate_urls, filter_types=filter_types, mode=mode
+        )
+    except Exception as e:
+        erro_msg = f"Error loading {filter_types} tables from {plate_urls}. "
+        st.error(erro_msg)
+        logger.error(erro_msg)
+        raise e
 
-        plate = get_ome_zarr_plate(url)
-        if plate._tables_container is None:
-            logger.warning(
-                f"Plate {url} does not contain any Plate level tables. Skipping."
-            )
-            continue
-        try:
-            list_tables = plate.list_tables(filter_types=filter_types)
-            for table_name in list_tables:
-                if table_name not in plate_tables:
-                    plate_tables[table_name] = []
-                plate_tables[table_name].append(url)
-            logger.info(f"List of plate tables in {url}: {list_tables}")
-        except Exception as e:
-            erro_msg = f"Error loading {filter_types} tables from {url}. "
-            st.error(erro_msg)
-            logger.error(erro_msg)
-            raise e
-
-    if mode == "all":
-        logger.info(f"List of plate level tables: {plate_tables}")
-        return list(plate_tables.keys())
-    elif mode == "common":
-        common_tables = []
-        logger.info(f"List of common plate level tables: {plate_tables}")
-        for table_name, urls in plate_tables.items():
-            if len(urls) == len(plate_urls):
-                common_tables.append(table_name)
-        return common_tables
-    else:
-        raise ValueError(f"Invalid mode {mode}. Must be 'all' or 'common'.")
+    logger.info(f"List of {mode} plate level tables: {plate_tables}")
+    return plate_tables
 
 
 def list_images_tables(
@@ -74,17 +101,170 @@ def list_images_tables(
     filter_types: str = "condition_table",
     mode: Literal["all", "common"] = "common",
 ) -> list[str]:
-    """Collect existing image tables from the plate URLs."""
-    images_urls = plate_setup_df["image_url"].unique().to_list()
-    images = [get_ome_zarr_container(url, mode="plate") for url in images_urls]
-    images_condition_tables = asyncio.run(
-        list_image_tables_async(images=images, filter_types=filter_types, mode=mode)
+    """Collect existing image tables from the plate URLs.
+
+    The tables are looked up in the (cached) tables catalog of each plate.
+    """
+    images_urls = plate_setup_df["image_url"].unique(maintain_order=True).to_list()
+    images = []
+    for url in images_urls:
+        *_plate_url, row, column, path_in_well = url.split("/")
+        images.append(("/".join(_plate_url), f"{row}/{column}/{path_in_well}"))
+    images_tables = query_images_tables(images, filter_types=filter_types, mode=mode)
+    logger.info(f"List of {mode} image level tables: {images_tables}")
+    return images_tables
+
+
+# ====================================================================
+#
+# Image tables utils
+#
+# ====================================================================
+
+
+def _resolve_plates_images_indexes(
+    list_urls: list[str], fractal_token: str | None = None
+) -> dict[str, OmeZarrContainer]:
+    """Map the image URLs to their containers, from the images index of their plate.
+
+    Building an index runs on the shared event loop, so this must happen in the
+    script thread before the images tables are loaded concurrently, and the
+    containers are passed explicitly to the loading threads. Otherwise the
+    loading threads would build the evicted indexes themselves, blocking the
+    workers the event loop needs.
+    """
+    indexes = {}
+    for plate_url in sorted({url.rsplit("/", 3)[0] for url in list_urls}):
+        indexes[plate_url] = _get_plate_images_index(
+            plate_url, fractal_token=fractal_token
+        )
+
+    containers = {}
+    for url in list_urls:
+        plate_url, row, column, path_in_well = url.rsplit("/", 3)
+        path = f"{row}/{column}/{path_in_well}"
+        if path not in indexes[plate_url]:
+            raise ValueError(f"Image {path} not found in plate {plate_url}.")
+        containers[url] = indexes[plate_url][path]
+    return containers
+
+
+@st_cache_resource_wrapper(
+    source="url", source_path="tables/{table_name}", authorize="url"
+)
+def _load_image_table(
+    url: str,
+    table_name: str,
+    columns: list[str] | None = None,
+    mode: Literal["plate", "image"] = "plate",
+    feature_table: bool = False,
+    compact: bool = False,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+    *,
+    _container: OmeZarrContainer | None = None,
+) -> pl.DataFrame:
+    """Load a table from a single image URL.
+
+    The extras from the URL are added as string columns, and feature tables
+    are indexed by a string label, as in the `ngio` tables concatenation.
+    If compact is True, feature tables are converted to compact dtypes
+    (see `compact_feature_table`) before being cached.
+    The tables are cached as resources one image at a time, and shared by all
+    the users allowed to read the image (the cache buster is part of the key).
+    The image container can be passed in `_container` if already resolved (it
+    is not part of the cache key).
+    """
+    image = _container
+    if image is None:
+        image = _get_ome_zarr_container(url, fractal_token=fractal_token, mode=mode)
+    if feature_table:
+        table = image.get_table_as(table_name, FeatureTable)
+    else:
+        table = image.get_table(table_name)
+
+    lazy_frame = table.load_as_polars_lf()
+    if feature_table:
+        lazy_frame = _project_feature_columns(lazy_frame, columns)
+        lazy_frame = lazy_frame.with_columns(pl.col(table.index_key).cast(pl.String))
+
+    lazy_frame = lazy_frame.with_columns(
+        pl.lit(value, dtype=pl.String()).alias(column)
+        for column, value in extras_from_url(url).items()
+    )
+    if feature_table:
+        lazy_frame = lazy_frame.with_columns(
+            pl.lit(table.reference_label).alias("reference_label")
+        )
+    table_df = lazy_frame.collect()
+    if feature_table and compact:
+        table_df, _ = compact_feature_table(table_df)
+    return table_df
+
+
+async def _load_image_tables_async(
+    list_urls: list[str],
+    load_table: Callable[[str], pl.DataFrame],
+    max_concurrency: int = 32,
+) -> list[pl.DataFrame]:
+    """Load a table from each image URL concurrently."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _load_image(url: str) -> pl.DataFrame:
+        async with semaphore:
+            return await to_thread_with_script_context(load_table, url)
+
+    return await asyncio.gather(*(_load_image(url) for url in list_urls))
+
+
+def _collect_image_tables(
+    list_urls: list[str],
+    table_name: str,
+    columns: list[str] | None = None,
+    mode: Literal["plate", "image"] = "plate",
+    feature_table: bool = False,
+    compact: bool = False,
+) -> pl.DataFrame:
+    """Assemble a table from the per-image cached tables.
+
+    Only the images missing from the cache are loaded, so that changing the
+    images selection does not reload the tables of all the images.
+    """
+    config = get_config()
+    fractal_token = get_fractal_token()
+    containers = {}
+    if mode == "plate":
+        containers = _resolve_plates_images_indexes(
+            list_urls, fractal_token=fractal_token
+        )
+
+    start = time.perf_counter()
+    load_image_table = functools.partial(
+        _load_image_table,
+        table_name=table_name,
+        columns=columns,
+        mode=mode,
+        feature_table=feature_table,
+        compact=compact,
+        fractal_token=fractal_token,
+        cache_buster=_get_cache_buster(),
+    )
+
+    def load_table(url: str) -> pl.DataFrame:
+        return load_image_table(url, _container=containers.get(url))
+
+    tables = run_coroutine(
+        _load_image_tables_async(
+            list_urls,
+            load_table,
+            max_concurrency=config.max_concurrent_images,
+        )
+    )
+    logger.info(
+        f"Table {table_name} collected from {len(list_urls)} images "
+        f"in {time.perf_counter() - start:.2f}s."
     )
-    if mode == "all":
-        logger.info(f"List of image level tables: {images_condition_tables}")
-    elif mode == "common":
-        logger.info(f"List of common image level tables: {images_condition_tables}")
-    return images_condition_tables
+    return pl.concat(tables, how="vertical", rechunk=False)
 
 
 # ====================================================================
@@ -94,7 +274,7 @@ def list_images_tables(
 # ====================================================================
 
 
-@st_cache_data_wrapper
+@st_cache_data_wrapper(source="url", source_path="tables/{table_name}", authorize="url")
 def _load_single_plate_condition_table(
     url: str,
     table_name: str,
@@ -109,6 +289,7 @@ def _load_single_plate_condition_table(
     table_df = table.lazy_frame.collect()
     table_df = table_df.with_columns(
         pl.lit(plate_name_from_url(url)).alias("plate_name"),
+        pl.col("row").cast(pl.Utf8),
         pl.col("column").cast(pl.Int64),
         pl.col("path_in_well").cast(pl.Utf8),
     )
@@ -124,7 +305,9 @@ def _load_single_plate_condition_table(
     return table_df
 
 
-@st_cache_data_wrapper
+@st_cache_data_wrapper(
+    source="list_urls", source_path="tables/{table_name}", authorize="list_urls"
+)
 def _collect_condition_table_from_plates_cached(
     list_urls: list[str],
     table_name: str,
@@ -141,26 +324,13 @@ def _collect_condition_table_from_plates_cached(
     return condition_table
 
 
-@st_cache_data_wrapper
-def _collect_condition_table_from_images_cached(
+def _collect_condition_table_from_images(
     list_urls: list[str],
     table_name: str,
     mode: Literal["plate", "image"] = "plate",
 ) -> pl.DataFrame:
     """Load the condition table from the image URLs."""
-    images = [get_ome_zarr_container(url, mode=mode) for url in list_urls]
-
-    extras = [extras_from_url(url) for url in list_urls]
-    # For more efficient loading, we should reimplement this
-    # using the streamlit caches
-    condition_table = asyncio.run(
-        concatenate_image_tables_async(
-            images=images,
-            extras=extras,
-            name=table_name,
-        )
-    )
-    condition_table = condition_table.lazy_frame.collect()
+    condition_table = _collect_image_tables(list_urls, table_name, mode=mode)
     if mode == "plate":
         condition_table = condition_table.with_columns(
             pl.col("column").cast(pl.Int64),
@@ -177,7 +347,7 @@ def _join_setup_to_condition_table(
     """Join the condition table with the plate setup DataFrame."""
     plate_setup_df = plate_setup_df.join(
         condition_df,
-        left_on=on,
+        on=on,
         how="inner",
     )
     return plate_setup_df
@@ -203,7 +373,7 @@ def collect_condition_table_from_images(
 ) -> pl.DataFrame:
     """Load the condition table from the image URLs."""
     images_urls = plate_setup_df["image_url"].unique().sort().to_list()
-    condition_df = _collect_condition_table_from_images_cached(
+    condition_df = _collect_condition_table_from_images(
         images_urls, table_name, mode=mode
     )
     return _join_setup_to_condition_table(plate_setup_df, condition_df, on=on)
@@ -216,13 +386,100 @@ def collect_condition_table_from_images(
 # ====================================================================
 
 
-@st_cache_data_wrapper
-def _load_plate_feature_table(
+def _project_feature_columns(
+    lazy_frame: pl.LazyFrame,
+    columns: list[str] | None = None,
+) -> pl.LazyFrame:
+    """Select the key columns and the requested feature columns.
+
+    If columns is None, all the columns are kept.
+    """
+    if columns is None:
+        return lazy_frame
+    keep_columns = set(columns).union(FEATURE_TABLE_KEY_COLUMNS)
+    table_columns = lazy_frame.collect_schema().names()
+    return lazy_frame.select([c for c in table_columns if c in keep_columns])
+
+
+@st_cache_data_wrapper(source="url", source_path="tables/{table_name}", authorize="url")
+def _feature_table_columns_cached(
     url: str,
     table_name: str,
-) -> pl.DataFrame:
-    """Load the feature table from a single plate URL."""
-    plate = get_ome_zarr_plate(url)
+    mode: Literal["plate", "image"] = "plate",
+) -> list[str]:
+    """List the columns of a feature table, without loading its data if possible."""
+    if mode == "plate":
+        table = get_ome_zarr_plate(url).get_table_as(table_name, FeatureTable)
+    else:
+        image = get_ome_zarr_container(url, mode="plate")
+        table = image.get_table_as(table_name, FeatureTable)
+    return table.load_as_polars_lf().collect_schema().names()
+
+
+def list_feature_table_columns(
+    plate_setup_df: pl.DataFrame,
+    table_name: str,
+    mode: Literal["plate", "image"] = "plate",
+) -> list[str]:
+    """List the feature columns (all but the key columns) of a feature table.
+
+    The columns are read from the table of the first plate (or image),
+    since the tables are expected to share the same schema.
+    """
+    url_column = "plate_url" if mode == "plate" else "image_url"
+    url = plate_setup_df[url_column].unique().sort().first()
+    columns = _feature_table_columns_cached(url, table_name, mode=mode)
+    return [c for c in columns if c not in FEATURE_TABLE_KEY_COLUMNS]
+
+
+def _wells_selection_predicate(
+    schema: pl.Schema,
+    selection: list[tuple[str, int, str]],
+) -> pl.Expr:
+    """Build a filter matching the selected (row, column, path_in_well) images.
+
+    The predicate is flat whatever the number of images: the `row` and
+    `column` membership tests can be pushed down to the table scan (e.g. to
+    skip Parquet row groups), and the exact images are matched on a single
+    `is_in` over the concatenated keys.
+    """
+    column_expr = pl.col("column")
+    if not schema["column"].is_integer():
+        column_expr = column_expr.cast(pl.Int64)
+    row_expr = pl.col("row")
+    if schema["row"] != pl.Utf8:
+        row_expr = row_expr.cast(pl.Utf8)
+    path_expr = pl.col("path_in_well")
+    if schema["path_in_well"] != pl.Utf8:
+        path_expr = path_expr.cast(pl.Utf8)
+
+    rows = sorted({row for row, _, _ in selection})
+    columns = sorted({int(column) for _, column, _ in selection})
+    keys = sorted(
+        {
+            f"{row}/{int(column)}/{path_in_well}"
+            for row, column, path_in_well in selection
+        }
+    )
+    images_key = pl.concat_str(
+        [row_expr, column_expr.cast(pl.Utf8), path_expr], separator="/"
+    )
+    return row_expr.is_in(rows) & column_expr.is_in(columns) & images_key.is_in(keys)
+
+
+def _scan_plate_feature_table(
+    url: str,
+    table_name: str,
+    columns: list[str] | None = None,
+    selection: list[tuple[str, int, str]] | None = None,
+    fractal_token: str | None = None,
+) -> pl.LazyFrame:
+    """Build a lazy scan of the feature table of a single plate URL.
+
+    If selection is given, only the rows of the selected
+    (row, column, path_in_well) images are scanned.
+    """
+    plate = _get_ome_zarr_plate(url, fractal_token=fractal_token)
     try:
         table = plate.get_table_as(table_name, FeatureTable)
         reference_label = table.reference_label
@@ -230,17 +487,11 @@ def _load_plate_feature_table(
         st.error(f"Error loading feature tables: {e}")
         raise e
 
-    table_df = table.lazy_frame.collect()
-    table_df = table_df.with_columns(
-        pl.lit(plate_name_from_url(url)).alias("plate_name"),
-        pl.col("column").cast(pl.Int64),
-        pl.col("path_in_well").cast(pl.Utf8),
-        pl.lit(reference_label).alias("reference_label"),
-    )
-
+    lazy_frame = table.load_as_polars_lf()
+    schema = lazy_frame.collect_schema()
     required_columns = ["row", "column", "path_in_well"]
     for column in required_columns:
-        if column not in table_df.columns:
+        if column not in schema:
             st.error(
                 f"Feature table {table_name} does not contain required column {column}."
             )
@@ -248,66 +499,183 @@ def _load_plate_feature_table(
                 f"Feature table {table_name} does not contain required column {column}."
             )
 
+    if selection is not None:
+        lazy_frame = lazy_frame.filter(_wells_selection_predicate(schema, selection))
+    lazy_frame = _project_feature_columns(lazy_frame, columns)
+    lazy_frame = lazy_frame.with_columns(
+        pl.lit(plate_name_from_url(url)).alias("plate_name"),
+        pl.col("row").cast(pl.Utf8),
+        pl.col("column").cast(pl.Int64),
+        pl.col("path_in_well").cast(pl.Utf8),
+        pl.lit(reference_label).alias("reference_label"),
+    )
+    return lazy_frame
+
+
+@st_cache_resource_wrapper(source="url", source_path="tables/{table_name}")
+def _scan_plate_feature_table_cached(
+    url: str,
+    table_name: str,
+    columns: list[str] | None = None,
+    selection: list[tuple[str, int, str]] | None = None,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+) -> pl.LazyFrame:
+    """Cached lazy scan of the feature table of a single plate URL."""
+    return _scan_plate_feature_table(
+        url, table_name, columns, selection, fractal_token=fractal_token
+    )
+
+
+@st_cache_resource_wrapper(
+    source="url", source_path="tables/{table_name}", authorize="url"
+)
+def _load_plate_feature_table(
+    url: str,
+    table_name: str,
+    columns: list[str] | None = None,
+    compact: bool = False,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+) -> pl.DataFrame:
+    """Load the whole feature table from a single plate URL.
+
+    The tables are cached as resources, one plate at a time, so that they are
+    shared without copies by all the selections (and all the users allowed to
+    read the plate) that include the plate. The images selection is applied
+    by the callers, so that changing it reuses the loaded plate. If compact is
+    True, the table is converted to compact dtypes (see
+    `compact_feature_table`) before being cached, so that only the compact
+    table is kept in memory.
+    """
+    table_df = _scan_plate_feature_table(
+        url, table_name, columns, fractal_token=fractal_token
+    ).collect()
+    if compact:
+        table_df, _ = compact_feature_table(table_df)
     return table_df
 
 
-@st_cache_data_wrapper
-def _collect_feature_table_from_plates_cached(
+async def _load_plate_feature_tables_async(
     list_urls: list[str],
     table_name: str,
+    columns: list[str] | None = None,
+    selections: dict[str, list[tuple[str, int, str]]] | None = None,
+    compact: bool = False,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+    max_concurrency: int = 8,
+) -> list[pl.DataFrame]:
+    """Load the feature table from each plate URL concurrently.
+
+    The whole plate tables are loaded (or found in the cache), and the images
+    selections are applied afterwards.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    selections = selections or {}
+
+    async def _load_plate(url: str) -> pl.DataFrame:
+        async with semaphore:
+            start = time.perf_counter()
+            table_df = await to_thread_with_script_context(
+                _load_plate_feature_table,
+                url,
+                table_name,
+                columns,
+                compact=compact,
+                fractal_token=fractal_token,
+                cache_buster=cache_buster,
+            )
+            selection = selections.get(url)
+            if selection is not None:
+                table_df = table_df.filter(
+                    _wells_selection_predicate(table_df.schema, selection)
+                )
+            logger.info(
+                f"Feature table {table_name} loaded from {url} "
+                f"in {time.perf_counter() - start:.2f}s ({len(table_df)} rows)."
+            )
+            return table_df
+
+    return await asyncio.gather(*(_load_plate(url) for url in list_urls))
+
+
+def _collect_feature_table_from_plates(
+    list_urls: list[str],
+    table_name: str,
+    columns: list[str] | None = None,
+    selections: dict[str, list[tuple[str, int, str]]] | None = None,
 ) -> pl.DataFrame:
-    """Load the feature table from the plate URLs."""
-    feature_tables = []
-    for url in list_urls:
-        table_df = _load_plate_feature_table(url, table_name)
-        feature_tables.append(table_df)
+    """Assemble the feature table from the per-plate cached tables.
 
-    feature_table = pl.concat(feature_tables)
+    Selections maps a plate URL to its selected (row, column, path_in_well)
+    images, plates missing from it are loaded entirely.
+    Only the plates missing from the cache are loaded, and the cached tables
+    are concatenated without rechunking, so that adding or removing a plate
+    does not copy the tables of the other plates.
+    """
+    config = get_config()
+    feature_tables = run_coroutine(
+        _load_plate_feature_tables_async(
+            list_urls,
+            table_name,
+            columns=columns,
+            selections=selections,
+            compact=config.compact_feature_table,
+            fractal_token=get_fractal_token(),
+            cache_buster=_get_cache_buster(),
+            max_concurrency=config.max_concurrent_plates,
+        )
+    )
+    feature_table = pl.concat(feature_tables, rechunk=False)
     return feature_table
 
 
-@st_cache_data_wrapper
-def _collect_feature_table_from_images_cached(
+def _collect_feature_table_from_images(
     list_urls: list[str],
     table_name: str,
+    columns: list[str] | None = None,
     mode: Literal["plate", "image"] = "plate",
 ) -> pl.DataFrame:
     """Load the feature table from the image URLs."""
-    images = [get_ome_zarr_container(url, mode="plate") for url in list_urls]
-
-    extras = [extras_from_url(url) for url in list_urls]
-    # For more efficient loading, we should reimplement this
-    # using the streamlit caches
-    feature_table = asyncio.run(
-        concatenate_image_tables_as_async(
-            images=images,
-            extras=extras,
-            name=table_name,
-            table_cls=FeatureTable,
-            mode="lazy",
-        )
+    feature_df = _collect_image_tables(
+        list_urls,
+        table_name,
+        columns=columns,
+        mode=mode,
+        feature_table=True,
+        compact=get_config().compact_feature_table,
     )
-    feature_df = feature_table.lazy_frame.collect()
     if mode == "plate":
-        feature_df = feature_df.with_columns(
-            pl.col("column").cast(pl.Int64),
-            pl.col("path_in_well").cast(pl.Utf8),
-            pl.lit(feature_table.reference_label).alias("reference_label"),
-        )
-    else:
-        feature_df = feature_df.with_columns(
-            pl.lit(feature_table.reference_label).alias("reference_label"),
-        )
+        # The extras are already strings (or categoricals in compact mode)
+        feature_df = feature_df.with_columns(pl.col("column").cast(pl.Int64))
     return feature_df
 
 
 def _join_feature_table_to_setup(
-    plate_setup_df: pl.DataFrame,
-    feature_df: pl.DataFrame,
+    plate_setup_df: pl.DataFrame | pl.LazyFrame,
+    feature_df: pl.DataFrame | pl.LazyFrame,
     on=("plate_name", "row", "column", "path_in_well"),
     drop=("plate_url",),
-) -> pl.DataFrame:
-    """Join the feature table with the plate setup DataFrame."""
+) -> pl.DataFrame | pl.LazyFrame:
+    """Join the feature table with the plate setup DataFrame.
+
+    If the feature table was loaded in compact mode, the string columns of the
+    setup table are converted to categoricals too, to join on the same dtypes.
+    """
+    schema = feature_df.collect_schema()
+    categorical_columns = [
+        column
+        for column in on
+        if column in schema and isinstance(schema[column], pl.Categorical)
+    ]
+    if categorical_columns:
+        setup_schema = plate_setup_df.collect_schema()
+        plate_setup_df = plate_setup_df.with_columns(
+            pl.col(column).cast(pl.Categorical())
+            for column in COMPACT_CATEGORICAL_COLUMNS
+            if setup_schema.get(column) == pl.String()
+        )
     feature_df = feature_df.join(
         plate_setup_df,
         on=on,
@@ -317,25 +685,353 @@ def _join_feature_table_to_setup(
     return feature_df
 
 
+def _plates_images_selection(
+    plate_setup_df: pl.DataFrame,
+) -> dict[str, list[tuple[str, int, str]]]:
+    """Collect the selected (row, column, path_in_well) images of each plate.
+
+    Plates with all their images selected are not included, so that their
+    table is loaded (and cached) without any filter.
+    """
+    selections = {}
+    for (plate_url,), plate_df in plate_setup_df.sort(
+        "row", "column", "path_in_well"
+    ).group_by("plate_url", maintain_order=True):
+        num_images = len(get_ome_zarr_plate(plate_url).images_paths())
+        if len(plate_df) >= num_images:
+            continue
+        selections[plate_url] = list(
+            plate_df.select("row", "column", "path_in_well").iter_rows()
+        )
+        logger.info(
+            f"Loading {len(plate_df)} of {num_images} images from plate {plate_url}."
+        )
+    return selections
+
+
+def _sources_fingerprints(
+    sources: list[tuple[str, str]], fractal_token: str | None = None
+) -> list[str | None]:
+    """Get the fingerprints of the (plate URL, node path) table sources."""
+    paths_by_plate: dict[str, list[str]] = {}
+    for plate_url, path in sources:
+        paths_by_plate.setdefault(plate_url, []).append(path)
+
+    fingerprints = []
+    for plate_url, paths in sorted(paths_by_plate.items()):
+        fingerprints.extend(
+            nodes_fingerprints(plate_url, paths, fractal_token=fractal_token)
+        )
+    return fingerprints
+
+
+def _setup_table_hash(plate_setup_df: pl.DataFrame) -> str:
+    """Hash the plate setup table, independently of the order of its rows.
+
+    The rows order of the setup table does not change the assembled table,
+    and is not stable across reruns.
+    """
+    setup_csv = plate_setup_df.sort(plate_setup_df.columns).write_csv()
+    return hashlib.sha256(setup_csv.encode()).hexdigest()
+
+
+def _disk_cached_feature_table(
+    setup_hash: str,
+    table_name: str,
+    columns: list[str] | None,
+    sources: list[tuple[str, str]],
+    load: Callable[[], pl.DataFrame | None],
+) -> pl.DataFrame | None:
+    """Get the assembled feature table from the disk cache, or load it.
+
+    This is only called on a miss of the in-memory cache of the assembled
+    tables. The entries are keyed by the plate setup table hash (see
+    `_setup_table_hash`), the table name, the columns and the fingerprints of
+    the table sources, so that the cached table is reloaded whenever one of
+    its sources changes.
+    """
+    cache = get_table_disk_cache()
+    if cache is None:
+        return load()
+
+    start = time.perf_counter()
+    fingerprints = _sources_fingerprints(sources, fractal_token=get_fractal_token())
+    key = hash_key(
+        "feature_table",
+        table_name,
+        columns,
+        setup_hash,
+        fingerprints,
+        get_config().compact_feature_table,
+    )
+    feature_table = read_cached_table(cache, key)
+    if feature_table is not None:
+        logger.info(
+            f"Feature table {table_name} read from the disk cache in "
+            f"{time.perf_counter() - start:.2f}s ({feature_table.height} rows)."
+        )
+        return feature_table
+
+    def _load_and_store() -> pl.DataFrame | None:
+        feature_table = load()
+        if feature_table is not None and all(f is not None for f in fingerprints):
+            plate_urls = sorted({plate_url for plate_url, _ in sources})
+            write_cached_table(
+                cache,
+                key,
+                feature_table,
+                metadata={"table_name": table_name, "plate_urls": plate_urls},
+            )
+        return feature_table
+
+    # Concurrent sessions assembling the same table wait for the first one
+    return single_flight(
+        f"table_disk_cache:{key}",
+        _load_and_store,
+        timeout=get_config().single_flight_timeout,
+    )
+
+
+@st_cache_resource_wrapper(
+    source="plate_urls",
+    source_path="tables/{table_name}",
+    authorize="plate_urls",
+    max_entries=ASSEMBLED_TABLES_MAX_ENTRIES,
+)
+def _assemble_feature_table_from_plates(
+    plate_urls: list[str],
+    table_name: str,
+    columns: list[str] | None,
+    setup_hash: str,
+    compact: bool = False,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+    *,
+    _plate_setup_df: pl.DataFrame,
+) -> pl.DataFrame | None:
+    """Assemble the feature table from the plate URLs.
+
+    The assembled tables are cached in memory, keyed by the order-independent
+    hash of the setup table (`_plate_setup_df` itself is not hashed), and the
+    disk cache is only consulted on a miss, so that a rerun with the same
+    selection does not read the disk cache again.
+    """
+    plate_setup_df = _plate_setup_df
+
+    def _load() -> pl.DataFrame | None:
+        selections = _plates_images_selection(plate_setup_df)
+        feature_table = _collect_feature_table_from_plates(
+            plate_urls, table_name, columns=columns, selections=selections
+        )
+        if feature_table is None:
+            return None
+        return _join_feature_table_to_setup(plate_setup_df, feature_table)
+
+    sources = [(url, f"tables/{table_name}") for url in plate_urls]
+    return _disk_cached_feature_table(
+        setup_hash, table_name, columns, sources=sources, load=_load
+    )
+
+
 def collect_feature_table_from_plates(
     plate_setup_df: pl.DataFrame,
     table_name: str,
+    columns: list[str] | None = None,
 ) -> pl.DataFrame | None:
-    """Load the feature table from the plate URLs."""
+    """Load the feature table from the plate URLs.
+
+    If columns is given, only these feature columns (plus the key columns)
+    are loaded.
+    """
+    return _assemble_feature_table_from_plates(
+        plate_setup_df["plate_url"].unique().sort().to_list(),
+        table_name,
+        columns,
+        _setup_table_hash(plate_setup_df),
+        compact=get_config().compact_feature_table,
+        fractal_token=get_fractal_token(),
+        cache_buster=_get_cache_buster(),
+        _plate_setup_df=plate_setup_df,
+    )
+
+
+def scan_feature_table_from_plates(
+    plate_setup_df: pl.DataFrame,
+    table_name: str,
+    columns: list[str] | None = None,
+) -> pl.LazyFrame:
+    """Lazily scan the feature table from the plate URLs.
+
+    Nothing is loaded until the returned LazyFrame is collected, so that the
+    filters and the plots can push down their projections and predicates.
+    """
     plate_urls = plate_setup_df["plate_url"].unique().sort().to_list()
-    feature_table = _collect_feature_table_from_plates_cached(plate_urls, table_name)
-    if feature_table is None:
-        return None
-    feature_table = _join_feature_table_to_setup(plate_setup_df, feature_table)
+    selections = _plates_images_selection(plate_setup_df)
+    fractal_token = get_fractal_token()
+    cache_buster = _get_cache_buster()
+    lazy_frames = [
+        _scan_plate_feature_table_cached(
+            url,
+            table_name,
+            columns,
+            selections.get(url),
+            fractal_token=fractal_token,
+            cache_buster=cache_buster,
+        )
+        for url in plate_urls
+    ]
+    feature_table = pl.concat(lazy_frames)
+    return _join_feature_table_to_setup(plate_setup_df.lazy(), feature_table)
+
+
+@st_cache_data_wrapper(source="url", source_path="tables/{table_name}", authorize="url")
+def _count_plate_feature_table_rows(
+    url: str,
+    table_name: str,
+    selection: list[tuple[str, int, str]] | None = None,
+    fractal_token: str | None = None,
+) -> int:
+    """Count the rows of the feature table of a single plate URL.
+
+    If selection is given, only the rows of the selected images are counted.
+    """
+    lazy_frame = _scan_plate_feature_table(
+        url, table_name, selection=selection, fractal_token=fractal_token
+    )
+    return lazy_frame.select(pl.len()).collect().item()
+
+
+def count_feature_table_from_plates(
+    plate_setup_df: pl.DataFrame,
+    table_name: str,
+) -> int:
+    """Count the rows of the lazy feature table from the plate URLs.
+
+    The counts are cached one plate (and images selection) at a time, so that
+    the lazy scan is not collected again on every run.
+    """
+    plate_urls = plate_setup_df["plate_url"].unique().sort().to_list()
+    selections = _plates_images_selection(plate_setup_df)
+    return sum(
+        _count_plate_feature_table_rows(url, table_name, selections.get(url))
+        for url in plate_urls
+    )
+
+
+@st_cache_resource_wrapper(
+    source="images_urls",
+    source_path="tables/{table_name}",
+    authorize="images_urls",
+    max_entries=ASSEMBLED_TABLES_MAX_ENTRIES,
+)
+def _assemble_feature_table_from_images(
+    images_urls: list[str],
+    table_name: str,
+    columns: list[str] | None,
+    setup_hash: str,
+    compact: bool = False,
+    fractal_token: str | None = None,
+    cache_buster: int = 0,
+    *,
+    _plate_setup_df: pl.DataFrame,
+) -> pl.DataFrame:
+    """Assemble the feature table from the image URLs.
+
+    Cached in memory in front of the disk cache, as the plate tables.
+    """
+    plate_setup_df = _plate_setup_df
+
+    def _load() -> pl.DataFrame:
+        feature_table = _collect_feature_table_from_images(
+            images_urls, table_name, columns=columns
+        )
+        return _join_feature_table_to_setup(plate_setup_df, feature_table)
+
+    sources = []
+    for url in images_urls:
+        *_plate_url, row, column, path_in_well = url.split("/")
+        sources.append(
+            (
+                "/".join(_plate_url),
+                f"{row}/{column}/{path_in_well}/tables/{table_name}",
+            )
+        )
+    feature_table = _disk_cached_feature_table(
+        setup_hash, table_name, columns, sources=sources, load=_load
+    )
+    assert feature_table is not None
     return feature_table
 
 
 def collect_feature_table_from_images(
     plate_setup_df: pl.DataFrame,
     table_name: str,
+    columns: list[str] | None = None,
 ) -> pl.DataFrame:
-    """Load the feature table from the image URLs."""
-    images_urls = plate_setup_df["image_url"].unique().sort().to_list()
-    feature_table = _collect_feature_table_from_images_cached(images_urls, table_name)
-    feature_table = _join_feature_table_to_setup(plate_setup_df, feature_table)
-    return feature_table
+    """Load the feature table from the image URLs.
+
+    If columns is given, only these feature columns (plus the key columns)
+    are kept.
+    """
+    return _assemble_feature_table_from_images(
+        plate_setup_df["image_url"].unique().sort().to_list(),
+        table_name,
+        columns,
+        _setup_table_hash(plate_setup_df),
+        compact=get_config().compact_feature_table,
+        fractal_token=get_fractal_token(),
+        cache_buster=_get_cache_buster(),
+        _plate_setup_df=plate_setup_df,
+    )
+
+
+# ====================================================================
+#
+# Compact dtypes
+#
+# ====================================================================
+
+
+def _fits_float32(series: pl.Series, rtol: float = 1e-6) -> bool:
+    """Check if a float64 series round-trips to float32 within tolerance."""
+    round_trip = series.cast(pl.Float32).cast(pl.Float64)
+    exact = (round_trip == series) | (series.is_nan() & round_trip.is_nan())
+    close = (round_trip - series).abs() <= rtol * series.abs()
+    return bool((exact | close).fill_null(True).all())
+
+
+def compact_feature_table(
+    feature_df: pl.DataFrame,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Convert the feature table to compact dtypes.
+
+    The repeated string key columns are converted to `pl.Categorical`, and the
+    float64 features that round-trip to float32 are downcast.
+
+    Returns the compact table and a per-column report of the bytes saved.
+    """
+    casts = {}
+    for name, dtype in feature_df.schema.items():
+        if name in COMPACT_CATEGORICAL_COLUMNS and dtype == pl.String():
+            casts[name] = pl.Categorical()
+        elif dtype == pl.Float64() and _fits_float32(feature_df[name]):
+            casts[name] = pl.Float32()
+
+    compact_df = feature_df.cast(casts)
+    report = pl.DataFrame(
+        {
+            "column": list(casts),
+            "dtype_before": [str(feature_df.schema[name]) for name in casts],
+            "dtype_after": [str(dtype) for dtype in casts.values()],
+            "bytes_before": [feature_df[name].estimated_size() for name in casts],
+            "bytes_after": [compact_df[name].estimated_size() for name in casts],
+        },
+        schema_overrides={"bytes_before": pl.Int64, "bytes_after": pl.Int64},
+    ).with_columns(
+        (pl.col("bytes_before") - pl.col("bytes_after")).alias("bytes_saved"),
+    )
+    logger.info(
+        f"Compact feature table: {feature_df.estimated_size('mb'):.1f} MB -> "
+        f"{compact_df.estimated_size('mb'):.1f} MB."
+    )
+    return compact_df, report
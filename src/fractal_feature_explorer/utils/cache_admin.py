@@ -0,0 +1,148 @@
+"""Listing and eviction of the cache entries of a plate, for the cache admins.
+
+Only the byte-budgeted memory cache (see `cache_max_bytes`), the disk cache
+of the feature tables (see `table_disk_cache_dir`) and the HTTP block cache
+(see `http_disk_cache_dir`) keep track of the sources of their entries; the
+streamlit caches can only be cleared as a whole. When the cache page is
+enabled (`cache_admin_page`), the cached loaders use the memory cache, even
+without byte budget, so that all their entries can be evicted by plate.
+"""
+
+import re
+import time
+
+import polars as pl
+from streamlit.logger import get_logger
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.http_block_cache import get_http_block_cache
+from fractal_feature_explorer.utils.memory_cache import get_memory_cache
+from fractal_feature_explorer.utils.table_disk_cache import get_table_disk_cache
+
+logger = get_logger(__name__)
+
+_ENTRIES_SCHEMA = {
+    "cache": pl.String,
+    "plate_url": pl.String,
+    "table_name": pl.String,
+    "function": pl.String,
+    "size_bytes": pl.Int64,
+    "age_seconds": pl.Float64,
+    "idle_seconds": pl.Float64,
+    "hits": pl.Int64,
+}
+
+
+def plate_url_of(url: str) -> str:
+    """Get the URL of the plate (the `.zarr` root) containing a node."""
+    match = re.match(r"^(.*?\.zarr)(/|$)", url)
+    return match.group(1) if match else url
+
+
+def url_in_plate(url: str, plate_url: str) -> bool:
+    """Check if the URL is the plate URL or one of its nodes."""
+    plate_url = plate_url.rstrip("/")
+    return url == plate_url or url.startswith(f"{plate_url}/")
+
+
+def memory_cache_enabled() -> bool:
+    config = get_config()
+    return (
+        config.cache_max_bytes is not None
+        or bool(config.cache_function_max_bytes)
+        or config.cache_admin_page
+    )
+
+
+def list_cache_entries() -> pl.DataFrame:
+    """List the entries of the caches, one row per entry and plate."""
+    now = time.time()
+    rows = []
+    if memory_cache_enabled():
+        for _, entry in get_memory_cache().entries():
+            plate_urls = sorted({plate_url_of(url) for url in entry.urls}) or [None]
+            for plate_url in plate_urls:
+                rows.append(
+                    {
+                        "cache": "memory",
+                        "plate_url": plate_url,
+                        "table_name": entry.table_name,
+                        "function": entry.func_name,
+                        "size_bytes": entry.size,
+                        "age_seconds": now - entry.created_at,
+                        "idle_seconds": now - entry.accessed_at,
+                        "hits": entry.hits,
+                    }
+                )
+
+    disk_cache = get_table_disk_cache()
+    if disk_cache is not None:
+        for key, size, accessed_at in disk_cache.entries():
+            metadata = disk_cache.get_metadata(key) or {}
+            for plate_url in metadata.get("plate_urls") or [None]:
+                rows.append(
+                    {
+                        "cache": "table_disk_cache",
+                        "plate_url": plate_url,
+                        "table_name": metadata.get("table_name"),
+                        "function": "feature_table",
+                        "size_bytes": size,
+                        "age_seconds": None,
+                        "idle_seconds": now - accessed_at,
+                        "hits": None,
+                    }
+                )
+
+    block_cache = get_http_block_cache()
+    if block_cache is not None:
+        for key, size, accessed_at in block_cache.entries():
+            url = (block_cache.get_metadata(key) or {}).get("url")
+            rows.append(
+                {
+                    "cache": "http_block_cache",
+                    "plate_url": None if url is None else plate_url_of(url),
+                    "table_name": None,
+                    "function": "http_block",
+                    "size_bytes": size,
+                    "age_seconds": None,
+                    "idle_seconds": now - accessed_at,
+                    "hits": None,
+                }
+            )
+    return pl.DataFrame(rows, schema=_ENTRIES_SCHEMA)
+
+
+def evict_plate(plate_url: str) -> dict[str, int]:
+    """Remove all the cache entries read from a plate.
+
+    Returns the number of entries removed from each cache.
+    """
+    evicted = {}
+    if memory_cache_enabled():
+        evicted["memory"] = get_memory_cache().evict_entries(
+            lambda entry: any(url_in_plate(url, plate_url) for url in entry.urls)
+        )
+
+    disk_cache = get_table_disk_cache()
+    if disk_cache is not None:
+        num_evicted = 0
+        for key, _, _ in disk_cache.entries():
+            metadata = disk_cache.get_metadata(key) or {}
+            plate_urls = metadata.get("plate_urls") or []
+            if any(url_in_plate(url, plate_url) for url in plate_urls):
+                disk_cache.invalidate(key)
+                num_evicted += 1
+        evicted["table_disk_cache"] = num_evicted
+
+    block_cache = get_http_block_cache()
+    if block_cache is not None:
+        num_evicted = 0
+        for key, _, _ in block_cache.entries():
+            url = (block_cache.get_metadata(key) or {}).get("url")
+            if url is not None and url_in_plate(url, plate_url):
+                block_cache.invalidate(key)
+                num_evicted += 1
+        evicted["http_block_cache"] = num_evicted
+
+    logger.info(f"Evicted the cache entries of {plate_url}: {evicted}.")
+    return evicted
@@ -0,0 +1,226 @@
+"""Metrics of the cached loaders, in the Prometheus text format.
+
+The cache wrappers (see `st_cache_data_wrapper`) record the calls and the
+computations of each cached function. They are reported together with the
+entries and bytes held by the caches, the process memory and the number of
+active sessions by the `/metrics` route of the app.
+"""
+
+import bisect
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+if sys.platform != "win32":
+    import resource
+
+PREFIX = "fractal_explorer"
+
+# Upper bounds of the compute time histogram buckets, in seconds
+COMPUTE_SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+@dataclass
+class FunctionMetrics:
+    """Calls and computations of a cached function."""
+
+    calls: int = 0
+    misses: int = 0
+    errors: int = 0
+    compute_seconds: float = 0.0
+    # Number of computations per bucket, the last one is +Inf
+    compute_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(COMPUTE_SECONDS_BUCKETS) + 1)
+    )
+
+
+_metrics: dict[str, FunctionMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def record_call(func_name: str) -> None:
+    """Record a call to a cached function."""
+    with _metrics_lock:
+        _metrics.setdefault(func_name, FunctionMetrics()).calls += 1
+
+
+def record_compute(func_name: str, seconds: float, error: bool = False) -> None:
+    """Record a computation (a cache miss) of a cached function."""
+    bucket = bisect.bisect_left(COMPUTE_SECONDS_BUCKETS, seconds)
+    with _metrics_lock:
+        metrics = _metrics.setdefault(func_name, FunctionMetrics())
+        metrics.misses += 1
+        metrics.errors += error
+        metrics.compute_seconds += seconds
+        metrics.compute_buckets[bucket] += 1
+
+
+def process_rss_bytes() -> int | None:
+    """Get the resident memory of the process (its peak if not available).
+
+    Returns None on Windows, where the `resource` module is not available.
+    """
+    if sys.platform == "win32":
+        return None
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in KiB elsewhere
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _num_active_sessions() -> int | None:
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.stats import ACTIVE_SESSIONS_FAMILY
+
+    if not Runtime.exists():
+        return None
+    stats = Runtime.instance().stats_mgr.get_stats([ACTIVE_SESSIONS_FAMILY])
+    return sum(stat.value for stat in stats.get(ACTIVE_SESSIONS_FAMILY, []))
+
+
+def _streamlit_data_caches() -> dict[str, tuple[int, int]]:
+    """Get the entries and bytes of the `st.cache_data` caches, by function.
+
+    The `st.cache_resource` caches are not reported, measuring their entries
+    walks the whole object graph of the cached resources.
+    """
+    from streamlit.runtime.caching import get_data_cache_stats_provider
+    from streamlit.runtime.stats import CACHE_MEMORY_FAMILY
+
+    caches: dict[str, tuple[int, int]] = {}
+    stats = get_data_cache_stats_provider().get_stats([CACHE_MEMORY_FAMILY])
+    for stat in stats.get(CACHE_MEMORY_FAMILY, []):
+        func_name = stat.cache_name.rpartition(".")[2]
+        num_entries, num_bytes = caches.get(func_name, (0, 0))
+        caches[func_name] = (num_entries + 1, num_bytes + stat.byte_length)
+    return caches
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, metric_type: str, help: str) -> str:
+        name = f"{PREFIX}_{name}"
+        self.lines.append(f"# HELP {name} {help}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+        return name
+
+    def sample(self, name: str, value: float, **labels: str) -> None:
+        if labels:
+            labels_str = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            name = f"{name}{{{labels_str}}}"
+        self.lines.append(f"{name} {value}")
+
+
+def render_metrics() -> str:
+    """Render all the metrics in the Prometheus text format."""
+    # Imported here, these modules depend on the cached loaders
+    from fractal_feature_explorer.utils.memory_cache import get_memory_cache
+    from fractal_feature_explorer.utils.single_flight import single_flight_stats
+
+    with _metrics_lock:
+        metrics = {
+            func_name: FunctionMetrics(
+                calls=m.calls,
+                misses=m.misses,
+                errors=m.errors,
+                compute_seconds=m.compute_seconds,
+                compute_buckets=list(m.compute_buckets),
+            )
+            for func_name, m in sorted(_metrics.items())
+        }
+
+    out = _Writer()
+    name = out.family("cache_hits_total", "counter", "Calls served from the cache.")
+    for func_name, m in metrics.items():
+        out.sample(name, m.calls - m.misses, function=func_name)
+    name = out.family("cache_misses_total", "counter", "Calls computing the value.")
+    for func_name, m in metrics.items():
+        out.sample(name, m.misses, function=func_name)
+    name = out.family("cache_errors_total", "counter", "Computations that failed.")
+    for func_name, m in metrics.items():
+        out.sample(name, m.errors, function=func_name)
+
+    name = out.family(
+        "cache_compute_seconds", "histogram", "Time spent computing the values."
+    )
+    for func_name, m in metrics.items():
+        cumulative = 0
+        for bound, count in zip(
+            (*COMPUTE_SECONDS_BUCKETS, "+Inf"), m.compute_buckets, strict=True
+        ):
+            cumulative += count
+            out.sample(f"{name}_bucket", cumulative, function=func_name, le=str(bound))
+        out.sample(f"{name}_sum", m.compute_seconds, function=func_name)
+        out.sample(f"{name}_count", m.misses, function=func_name)
+
+    memory_stats = get_memory_cache().function_stats()
+    data_caches = _streamlit_data_caches()
+    name = out.family("cache_entries", "gauge", "Entries held by the caches.")
+    for stats in memory_stats:
+        out.sample(name, stats.num_entries, function=stats.func_name, cache="memory")
+    for func_name, (num_entries, _) in data_caches.items():
+        out.sample(name, num_entries, function=func_name, cache="st_cache_data")
+    name = out.family("cache_bytes", "gauge", "Bytes held by the caches.")
+    for stats in memory_stats:
+        out.sample(name, stats.total_bytes, function=stats.func_name, cache="memory")
+    for func_name, (_, num_bytes) in data_caches.items():
+        out.sample(name, num_bytes, function=func_name, cache="st_cache_data")
+    name = out.family(
+        "cache_evictions_total", "counter", "Entries evicted from the memory cache."
+    )
+    for stats in memory_stats:
+        out.sample(name, stats.evictions, function=stats.func_name, cache="memory")
+
+    pool_stats = get_memory_cache().stats()
+    name = out.family(
+        "memory_cache_compressed_bytes",
+        "gauge",
+        "Compressed size of the compressed tables of the memory cache.",
+    )
+    for pool in pool_stats:
+        out.sample(name, pool.compressed_bytes, pool=pool.name)
+    name = out.family(
+        "memory_cache_uncompressed_bytes",
+        "gauge",
+        "Uncompressed size of the compressed tables of the memory cache.",
+    )
+    for pool in pool_stats:
+        out.sample(name, pool.uncompressed_bytes, pool=pool.name)
+    name = out.family(
+        "memory_cache_decompression_seconds",
+        "summary",
+        "Time spent decompressing the tables of the memory cache.",
+    )
+    for pool in pool_stats:
+        out.sample(f"{name}_sum", pool.decompression_seconds, pool=pool.name)
+        out.sample(f"{name}_count", pool.decompressions, pool=pool.name)
+
+    name = out.family(
+        "single_flight_deduplicated_total",
+        "counter",
+        "Calls that waited for a concurrent identical computation.",
+    )
+    out.sample(name, single_flight_stats()["deduplicated"])
+
+    rss_bytes = process_rss_bytes()
+    if rss_bytes is not None:
+        name = out.family(
+            "process_resident_memory_bytes", "gauge", "Resident memory of the process."
+        )
+        out.sample(name, rss_bytes)
+
+    num_sessions = _num_active_sessions()
+    if num_sessions is not None:
+        name = out.family("active_sessions", "gauge", "Number of active sessions.")
+        out.sample(name, num_sessions)
+    return "\n".join(out.lines) + "\n"
@@ -2,6 +2,7 @@ from enum import StrEnum
 
 import streamlit as st
 from streamlit.logger import get_logger
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 logger = get_logger(__name__)
 
@@ -26,6 +27,22 @@ def invalidate_session_state(key_prefix: str) -> None:
             del st.session_state[key]
 
 
+# Token used outside of the user sessions (e.g. by `explorer warm`)
+_default_fractal_token: str | None = None
+
+
+def set_default_fractal_token(fractal_token: str | None) -> None:
+    """Set the Fractal token used outside of the user sessions."""
+    global _default_fractal_token
+    _default_fractal_token = fractal_token
+
+
 def get_fractal_token() -> str | None:
-    """Get the Fractal token from the session state."""
+    """Get the Fractal token from the session state.
+
+    Outside of a user session (e.g. when warming the caches), the default token
+    is returned instead (see `set_default_fractal_token`).
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return _default_fractal_token
     return st.session_state.get(f"{Scope.PRIVATE}:fractal-token", None)
@@ -0,0 +1,138 @@
+"""Consolidated zarr metadata fast path for remote plates.
+
+`ngio` reads the metadata of every well, image and table node separately,
+which over HTTP is one request per node. If the plate has consolidated
+metadata (`.zmetadata` for zarr v2, or inline in the root `zarr.json` for
+zarr v3), it is fetched once and the metadata documents of all the nodes
+are served from memory instead.
+
+Consolidated metadata is a snapshot: nodes written after the consolidation
+(e.g. new tables) are still read from the store, but changes to the
+consolidated nodes are not seen until the plate is consolidated again
+(`explorer consolidate`).
+"""
+
+import json
+from typing import Any
+
+import fsspec
+import zarr
+from streamlit.logger import get_logger
+from zarr.abc.store import ByteRequest
+from zarr.core.buffer import Buffer, BufferPrototype
+from zarr.core.sync import sync
+from zarr.storage import FsspecStore
+
+logger = get_logger(__name__)
+
+# zarr also looks for `.zmetadata` when opening any group with zarr v2
+_METADATA_FILES = (".zgroup", ".zarray", ".zattrs", ".zmetadata", "zarr.json")
+
+
+def _split_key(key: str) -> tuple[str, str]:
+    """Split a store key into its node path and file name."""
+    node, _, name = key.rpartition("/")
+    return node, name
+
+
+class ConsolidatedFsspecStore(FsspecStore):
+    """An FsspecStore serving the zarr metadata documents from memory.
+
+    Metadata documents of the nodes listed in the consolidated metadata are
+    never fetched: they are served from `consolidated`, or reported missing
+    (e.g. the `.zarray` of a group). All the other keys are read from the store.
+    """
+
+    def __init__(self, *args, consolidated: dict[str, bytes] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.consolidated = consolidated or {}
+        self._nodes = {_split_key(key)[0] for key in self.consolidated}
+
+    def with_read_only(self, read_only: bool = False) -> "ConsolidatedFsspecStore":
+        store = super().with_read_only(read_only)
+        assert isinstance(store, ConsolidatedFsspecStore)
+        store.consolidated = self.consolidated
+        store._nodes = self._nodes
+        return store
+
+    def _is_consolidated(self, key: str) -> bool:
+        node, name = _split_key(key)
+        return name in _METADATA_FILES and node in self._nodes
+
+    async def get(
+        self,
+        key: str,
+        prototype: BufferPrototype,
+        byte_range: ByteRequest | None = None,
+    ) -> Buffer | None:
+        if byte_range is None and self._is_consolidated(key):
+            value = self.consolidated.get(key)
+            return None if value is None else prototype.buffer.from_bytes(value)
+        return await super().get(key, prototype, byte_range=byte_range)
+
+    async def exists(self, key: str) -> bool:
+        if self._is_consolidated(key):
+            return key in self.consolidated
+        return await super().exists(key)
+
+
+def _encode(document: dict[str, Any]) -> bytes:
+    return json.dumps(document).encode()
+
+
+async def _load_consolidated_metadata(fs, root: str) -> dict[str, bytes] | None:
+    """Fetch the consolidated metadata of a zarr v2 or v3 group.
+
+    Returns the metadata documents by store key, or None if the group is not
+    consolidated.
+    """
+    try:
+        zmetadata = await fs._cat_file(f"{root}/.zmetadata")
+    except FileNotFoundError:
+        zmetadata = None
+    if zmetadata is not None:
+        documents = {".zmetadata": zmetadata}
+        for key, doc in json.loads(zmetadata)["metadata"].items():
+            documents[key] = _encode(doc)
+        return documents
+
+    try:
+        root_metadata = await fs._cat_file(f"{root}/zarr.json")
+    except FileNotFoundError:
+        return None
+    consolidated = json.loads(root_metadata).get("consolidated_metadata")
+    if consolidated is None:
+        return None
+    documents = {"zarr.json": root_metadata}
+    for path, doc in consolidated.get("metadata", {}).items():
+        documents[f"{path}/zarr.json"] = _encode(doc)
+    return documents
+
+
+def consolidated_store(
+    fs_map: fsspec.mapping.FSMap,
+) -> fsspec.mapping.FSMap | ConsolidatedFsspecStore:
+    """Wrap a remote store to use its consolidated metadata, if there is any.
+
+    The store is returned unchanged if the group is not consolidated.
+    """
+    try:
+        documents = sync(_load_consolidated_metadata(fs_map.fs, fs_map.root))
+    except Exception as e:
+        logger.warning(f"Could not read consolidated metadata of {fs_map.root}: {e}")
+        return fs_map
+
+    if documents is None:
+        logger.info(f"No consolidated metadata found for {fs_map.root}.")
+        return fs_map
+    logger.info(
+        f"Using consolidated metadata for {fs_map.root} ({len(documents)} documents)."
+    )
+    return ConsolidatedFsspecStore(
+        fs=fs_map.fs, path=fs_map.root, read_only=True, consolidated=documents
+    )
+
+
+def consolidate_plate(path: str) -> None:
+    """Write the consolidated metadata of a local plate."""
+    zarr.consolidate_metadata(path)
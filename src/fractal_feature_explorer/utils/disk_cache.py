@@ -0,0 +1,234 @@
+"""A size-bounded, least-recently-used cache of files on the local disk.
+
+Each entry is stored as a data file plus a small JSON metadata sidecar.
+The access time of an entry is tracked through the modification time of its
+data file, so that the LRU order survives server restarts.
+
+The directory can be shared by several processes (e.g. the server workers and
+the `explorer warm` command): the entries written by another process are
+picked up on their first lookup. However each process keeps its own index and
+enforces the size budget on the entries it knows about only, so the directory
+can grow over the budget when several processes write to it.
+
+The data files may still be memory-mapped when they are evicted or replaced.
+On Windows, removing them then fails: the removal is retried on the next
+eviction pass, and the replacement is skipped.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from streamlit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DiskCacheStats:
+    """Statistics of a disk cache."""
+
+    directory: str
+    max_bytes: int
+    num_entries: int
+    total_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+def hash_key(*parts: object) -> str:
+    """Build a file-system safe cache key from arbitrary parts."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class DiskLRUCache:
+    """A thread-safe LRU cache of files, bounded by a total size in bytes."""
+
+    def __init__(self, directory: str | Path, max_bytes: int, suffix: str = ".bin"):
+        self._directory = Path(directory).expanduser()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last access time)
+        self._index: dict[str, tuple[int, float]] = {}
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # (key, path) of the files that could not be removed yet
+        self._pending_deletes: list[tuple[str, Path]] = []
+        self._load_index()
+
+    def _data_path(self, key: str) -> Path:
+        return self._directory / f"{key}{self._suffix}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Rebuild the index from the files already in the cache directory."""
+        for path in self._directory.glob(f"*{self._suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self._index[path.name.removesuffix(self._suffix)] = (
+                stat.st_size,
+                stat.st_mtime,
+            )
+            self._total_bytes += stat.st_size
+        logger.info(
+            f"Disk cache {self._directory} loaded with {len(self._index)} entries "
+            f"({self._total_bytes} bytes)."
+        )
+
+    def _unlink(self, key: str, path: Path) -> None:
+        try:
+            path.unlink(missing_ok=True)
+        except PermissionError:
+            # The file is still open or memory-mapped (Windows)
+            logger.debug(f"Could not remove {path}, retrying later.")
+            self._pending_deletes.append((key, path))
+
+    def _remove(self, key: str) -> None:
+        size, _ = self._index.pop(key, (0, 0.0))
+        self._total_bytes -= size
+        for path in (self._data_path(key), self._meta_path(key)):
+            self._unlink(key, path)
+
+    def _retry_pending_deletes(self) -> None:
+        pending, self._pending_deletes = self._pending_deletes, []
+        for key, path in pending:
+            # Skip the files of the entries cached again since
+            if key not in self._index:
+                self._unlink(key, path)
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the budget is met."""
+        self._retry_pending_deletes()
+        if self._total_bytes <= self._max_bytes:
+            return
+        lru_keys = sorted(self._index, key=lambda key: self._index[key][1])
+        for key in lru_keys:
+            self._remove(key)
+            self._evictions += 1
+            if self._total_bytes <= self._max_bytes:
+                break
+
+    def get_path(self, key: str) -> Path | None:
+        """Get the path of the data file of an entry, and mark it as used."""
+        with self._lock:
+            if key not in self._index and not self._adopt(key):
+                self._misses += 1
+                return None
+            path = self._data_path(key)
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                # The entry has been removed by another process
+                self._remove(key)
+                self._misses += 1
+                return None
+            self._index[key] = (self._index[key][0], now)
+            self._hits += 1
+            return path
+
+    def _adopt(self, key: str) -> bool:
+        """Index an entry written by another process, returns whether it exists."""
+        try:
+            size = self._data_path(key).stat().st_size
+        except FileNotFoundError:
+            return False
+        if not self._meta_path(key).exists():
+            # Not committed yet
+            return False
+        self._index[key] = (size, time.time())
+        self._total_bytes += size
+        return True
+
+    def get(self, key: str) -> tuple[bytes, dict] | None:
+        """Get the data and the metadata of an entry."""
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+            metadata = json.loads(self._meta_path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self._remove(key)
+            return None
+        return data, metadata
+
+    def get_metadata(self, key: str) -> dict | None:
+        """Get the metadata of an entry without marking it as used."""
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def new_tmp_path(self, key: str) -> Path:
+        """Get a temporary path to write the data of a new entry."""
+        return self._directory / f".{key}.{threading.get_ident()}.tmp"
+
+    def commit(self, key: str, tmp_path: Path, metadata: dict | None = None) -> None:
+        """Atomically move a temporary data file into the cache."""
+        size = tmp_path.stat().st_size
+        if size > self._max_bytes:
+            tmp_path.unlink(missing_ok=True)
+            return
+        meta_path = self._meta_path(key)
+        meta_tmp_path = meta_path.with_suffix(f".{threading.get_ident()}.tmp")
+        meta_tmp_path.write_text(json.dumps(metadata or {}))
+        with self._lock:
+            self._remove(key)
+            # The metadata is moved last, it marks the entry as committed for
+            # the other processes (see `_adopt`)
+            try:
+                os.replace(tmp_path, self._data_path(key))
+                os.replace(meta_tmp_path, meta_path)
+            except PermissionError as e:
+                # The previous data file is still memory-mapped (Windows)
+                logger.debug(f"Could not replace the entry {key}, not caching it: {e}")
+                for path in (tmp_path, meta_tmp_path, meta_path):
+                    self._unlink(key, path)
+                return
+            self._index[key] = (size, time.time())
+            self._total_bytes += size
+            self._evict()
+
+    def put(self, key: str, data: bytes, metadata: dict | None = None) -> None:
+        """Add (or replace) an entry."""
+        tmp_path = self.new_tmp_path(key)
+        tmp_path.write_bytes(data)
+        self.commit(key, tmp_path, metadata)
+
+    def entries(self) -> list[tuple[str, int, float]]:
+        """Get the key, size in bytes and last access time of all the entries."""
+        with self._lock:
+            return [(key, size, atime) for key, (size, atime) in self._index.items()]
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._remove(key)
+
+    def stats(self) -> DiskCacheStats:
+        """Get the statistics of the cache."""
+        with self._lock:
+            return DiskCacheStats(
+                directory=str(self._directory),
+                max_bytes=self._max_bytes,
+                num_entries=len(self._index),
+                total_bytes=self._total_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
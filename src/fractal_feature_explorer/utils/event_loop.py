@@ -0,0 +1,155 @@
+"""Shared background event loop for the ngio async calls.
+
+Streamlit runs each script in its own thread, and calling `asyncio.run` there
+creates (and tears down) a new event loop on every call. Instead, a single
+long-lived event loop runs in a daemon thread for the whole server process,
+and coroutines are submitted to it from the script threads.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from streamlit.logger import get_logger
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from fractal_feature_explorer.config import get_config
+
+logger = get_logger(__name__)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+_loader_executor: ThreadPoolExecutor | None = None
+_semaphore: asyncio.Semaphore | None = None
+_loop_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _mark_worker_thread() -> None:
+    """Initializer of the executor threads of the shared event loop."""
+    _worker_state.is_worker = True
+
+
+def _is_worker_thread() -> bool:
+    """Check if the current thread is an executor thread of the shared loop.
+
+    These threads run on behalf of a task of the shared loop, which already
+    holds a slot of the semaphore.
+    """
+    return getattr(_worker_state, "is_worker", False)
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared event loop, starting it on first use."""
+    global _loop, _loop_thread, _loader_executor, _semaphore
+    with _loop_lock:
+        if _loop is not None and _loop_thread is not None and _loop_thread.is_alive():
+            return _loop
+
+        config = get_config()
+        loop = asyncio.new_event_loop()
+        # The ngio async functions offload the blocking I/O with asyncio.to_thread,
+        # so the default executor is sized explicitly instead of relying on the
+        # (cpu-count based) asyncio default.
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=config.async_max_workers,
+                thread_name_prefix="fractal-explorer-io",
+                initializer=_mark_worker_thread,
+            )
+        )
+        # The cached loaders run in their own executor: they block on nested
+        # coroutines of the shared loop, which offload their I/O to the
+        # default executor, so they must not be able to exhaust it.
+        loader_executor = ThreadPoolExecutor(
+            max_workers=config.async_max_workers,
+            thread_name_prefix="fractal-explorer-loader",
+            initializer=_mark_worker_thread,
+        )
+        thread = threading.Thread(
+            target=loop.run_forever,
+            name="fractal-explorer-event-loop",
+            daemon=True,
+        )
+        thread.start()
+        _loop, _loop_thread, _loader_executor = loop, thread, loader_executor
+        _semaphore = asyncio.Semaphore(config.async_max_concurrency)
+        logger.info(
+            "Started shared event loop "
+            f"(max_concurrency={config.async_max_concurrency}, "
+            f"max_workers={config.async_max_workers})."
+        )
+        return loop
+
+
+async def _run_bounded(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run the coroutine while holding the global semaphore."""
+    assert _semaphore is not None, "The shared event loop is not running."
+    async with _semaphore:
+        return await coro
+
+
+def submit_coroutine(coro: Coroutine[Any, Any, Any]) -> Future:
+    """Submit a coroutine to the shared event loop.
+
+    Returns a `concurrent.futures.Future` that can be waited from any thread.
+    """
+    loop = _get_event_loop()
+    return asyncio.run_coroutine_threadsafe(_run_bounded(coro), loop)
+
+
+def run_coroutine(coro: Coroutine[Any, Any, Any], timeout: float | None = None) -> Any:
+    """Run a coroutine in the shared event loop and wait for its result.
+
+    This is a drop-in replacement for `asyncio.run` in the script threads.
+
+    When called from an executor thread of the shared loop (e.g. a cached
+    loader running in `to_thread_with_script_context`), the coroutine is
+    submitted to the shared loop without the semaphore: the outer task
+    already holds a slot, and waiting for another one would deadlock once all
+    the slots are held by outer tasks.
+    """
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError(
+            "run_coroutine can not be called from the shared event loop thread, "
+            "await the coroutine instead."
+        )
+    if _is_worker_thread():
+        future = asyncio.run_coroutine_threadsafe(coro, _get_event_loop())
+    else:
+        future = submit_coroutine(coro)
+    return future.result(timeout=timeout)
+
+
+def to_thread_with_script_context(
+    func: Callable[..., Any], /, *args: Any, **kwargs: Any
+) -> Coroutine[Any, Any, Any]:
+    """Like `asyncio.to_thread`, but the function runs with the script context.
+
+    The streamlit script run context of the calling thread is captured when
+    the coroutine is created, so that the function can access the session state
+    (e.g. the fractal token and the cache buster) from the worker thread.
+    The function runs in the loaders executor of the shared loop, not in the
+    default executor used by the ngio I/O.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def _run() -> Any:
+        thread = threading.current_thread()
+        add_script_run_ctx(thread, ctx)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            add_script_run_ctx(thread, None)
+
+    async def _run_in_loader_thread() -> Any:
+        _get_event_loop()
+        call = functools.partial(contextvars.copy_context().run, _run)
+        return await asyncio.get_running_loop().run_in_executor(_loader_executor, call)
+
+    return _run_in_loader_thread()
@@ -0,0 +1,92 @@
+"""Persistent local cache for the bytes read from remote zarr stores.
+
+The blocks (zarr metadata, table and chunk bytes) fetched over HTTP are stored
+in a size-bounded LRU cache on the local disk, and shared by all users.
+
+Cached bytes are never served blindly: every read is a conditional request
+(`If-None-Match`/`If-Modified-Since`) sent with the credentials of the current
+user, and the cached block is used only if the server answers
+`304 Not Modified`. Users who could not fetch the block themselves (e.g. if
+their fractal token is missing or not valid for the URL) get the same error
+they would get without the cache. Responses without an `ETag` or a
+`Last-Modified` header can not be revalidated, and are never cached.
+"""
+
+import asyncio
+import threading
+
+from fsspec.implementations.http import HTTPFileSystem
+from streamlit.logger import get_logger
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.disk_cache import DiskLRUCache, hash_key
+
+logger = get_logger(__name__)
+
+_block_cache: DiskLRUCache | None = None
+_block_cache_lock = threading.Lock()
+
+
+def get_http_block_cache() -> DiskLRUCache | None:
+    """Get the shared block cache, or None if it is not enabled in the config."""
+    global _block_cache
+    config = get_config()
+    if config.http_disk_cache_dir is None:
+        return None
+
+    with _block_cache_lock:
+        if _block_cache is None:
+            _block_cache = DiskLRUCache(
+                directory=config.http_disk_cache_dir,
+                max_bytes=config.http_disk_cache_max_bytes,
+            )
+        return _block_cache
+
+
+class BlockCachedHTTPFileSystem(HTTPFileSystem):
+    """An HTTPFileSystem that revalidates reads against the shared block cache.
+
+    The cache is looked up from the config instead of being passed to the
+    constructor, so that the filesystem can be serialized.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        block_cache = get_http_block_cache()
+        if block_cache is None:
+            raise ValueError("The HTTP block cache is not enabled in the config.")
+        self.block_cache = block_cache
+
+    async def _cat_file(self, url, start=None, end=None, **kwargs):
+        kw = self.kwargs.copy()
+        kw.update(kwargs)
+        headers = kw.pop("headers", {}).copy()
+
+        if start is not None or end is not None:
+            if start == end:
+                return b""
+            headers["Range"] = await self._process_limits(url, start, end)
+
+        key = hash_key(url, start, end)
+        cached = await asyncio.to_thread(self.block_cache.get, key)
+        if cached is not None:
+            _, metadata = cached
+            if metadata.get("etag") is not None:
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified") is not None:
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        session = await self.set_session()
+        async with session.get(self.encode_url(url), headers=headers, **kw) as r:
+            if r.status == 304 and cached is not None:
+                data, _ = cached
+                return data
+            out = await r.read()
+            self._raise_not_found_for_status(r, url)
+            etag = r.headers.get("ETag")
+            last_modified = r.headers.get("Last-Modified")
+
+        if etag is not None or last_modified is not None:
+            metadata = {"url": url, "etag": etag, "last_modified": last_modified}
+            await asyncio.to_thread(self.block_cache.put, key, out, metadata)
+        return out
@@ -0,0 +1,309 @@
+"""Pooled HTTP sessions for the remote zarr stores.
+
+All the stores pointing to the same host and opened with the same token share
+a single `HTTPFileSystem`, and therefore a single aiohttp session and
+connection pool, instead of creating a new session (and new TCP/TLS
+handshakes) for every plate and image URL.
+
+The session of an evicted pool is only closed once no store of the pool is
+alive anymore (e.g. once the cached stores of `_get_http_store` expired), so
+that it is not closed under the requests of the stores still in use.
+"""
+
+import functools
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import aiohttp
+import fsspec
+import urllib3.util
+from fsspec.implementations.http import HTTPFileSystem
+from ngio.utils import NgioValueError
+from streamlit.logger import get_logger
+from zarr.core.sync import sync
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.http_block_cache import (
+    BlockCachedHTTPFileSystem,
+    get_http_block_cache,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HttpPool:
+    """A shared HTTP filesystem for a (host, token) pair."""
+
+    host: str
+    authenticated: bool
+    fs: HTTPFileSystem
+    # Number of live stores using the pool
+    num_stores: int = 0
+    evicted: bool = False
+
+
+@dataclass
+class HttpPoolStats:
+    """Connection statistics of a single pool."""
+
+    host: str
+    authenticated: bool
+    num_stores: int
+    limit: int | None
+    open_connections: int
+    active_connections: int
+
+
+# Least recently used first, bounded by `http_max_pools`
+_pools: OrderedDict[tuple[str, str | None], HttpPool] = OrderedDict()
+_pools_lock = threading.Lock()
+# Evicted pools whose last store was released, closed on the next `_get_pool`
+_pools_to_close: list[HttpPool] = []
+
+
+async def _get_pooled_client(
+    pool_size: int,
+    keepalive_timeout: float,
+    connect_timeout: float,
+    read_timeout: float,
+    loop=None,
+    **client_kwargs,
+) -> aiohttp.ClientSession:
+    """Create the aiohttp session of a pool.
+
+    This is called by `HTTPFileSystem.set_session` from within the zarr
+    event loop, so the connector is bound to the right loop.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        keepalive_timeout=keepalive_timeout,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=None,
+        sock_connect=connect_timeout,
+        sock_read=read_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, **client_kwargs)
+
+
+class PooledHTTPFileSystem(HTTPFileSystem):
+    """An HTTPFileSystem whose aiohttp session uses the pool settings.
+
+    The settings are plain constructor arguments (instead of a `get_client`
+    callable), so that the filesystem can be serialized: `ngio` re-creates
+    a synchronous copy of it through JSON to read parquet tables.
+    """
+
+    def __init__(
+        self,
+        *args,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 30.0,
+        read_timeout: float = 300.0,
+        **kwargs,
+    ):
+        get_client = functools.partial(
+            _get_pooled_client,
+            pool_size=pool_size,
+            keepalive_timeout=keepalive_timeout,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        super().__init__(*args, get_client=get_client, **kwargs)
+
+
+class BlockCachedPooledHTTPFileSystem(BlockCachedHTTPFileSystem, PooledHTTPFileSystem):
+    """A pooled HTTPFileSystem that revalidates reads against the block cache."""
+
+
+def _host_from_url(url: str) -> str:
+    """Get the `scheme://host:port` part of the URL."""
+    parsed_url = urllib3.util.parse_url(url)
+    host = f"{parsed_url.scheme}://{parsed_url.host}"
+    if parsed_url.port is not None:
+        host = f"{host}:{parsed_url.port}"
+    return host
+
+
+def _get_pool(url: str, fractal_token: str | None = None) -> HttpPool:
+    """Get (or create) the pool for the URL host and token.
+
+    At most `http_max_pools` pools are kept, the sessions of the least recently
+    used ones are closed (e.g. the pools of expired tokens) once their stores
+    are released.
+    """
+    host = _host_from_url(url)
+    key = (host, fractal_token)
+    with _pools_lock:
+        # The pools released by the store finalizers are closed here, as the
+        # finalizers can run in any thread (e.g. the zarr event loop thread)
+        to_close = _pools_to_close.copy()
+        _pools_to_close.clear()
+        pool = _pools.get(key)
+        if pool is not None:
+            _pools.move_to_end(key)
+        else:
+            pool = _new_pool(host, fractal_token)
+            _pools[key] = pool
+            while len(_pools) > max(get_config().http_max_pools, 1):
+                _, evicted_pool = _pools.popitem(last=False)
+                evicted_pool.evicted = True
+                logger.info(
+                    f"Evicted HTTP pool for {evicted_pool.host} "
+                    f"(authenticated={evicted_pool.authenticated})."
+                )
+                # The pools still used by stores are closed on their release
+                if evicted_pool.num_stores == 0:
+                    to_close.append(evicted_pool)
+
+    for closed_pool in to_close:
+        _close_pool(closed_pool)
+    return pool
+
+
+def _new_pool(host: str, fractal_token: str | None) -> HttpPool:
+    config = get_config()
+    client_kwargs = {}
+    if fractal_token is not None:
+        client_kwargs["headers"] = {"Authorization": f"Bearer {fractal_token}"}
+    # The filesystem is created in asynchronous mode, so that zarr uses this
+    # instance (and its session) directly from its own event loop, instead
+    # of re-creating a new async filesystem for each store.
+    fs_kwargs = {
+        "asynchronous": True,
+        "client_kwargs": client_kwargs,
+        "pool_size": config.http_pool_size,
+        "keepalive_timeout": config.http_keepalive_timeout,
+        "connect_timeout": config.http_connect_timeout,
+        "read_timeout": config.http_read_timeout,
+        "skip_instance_cache": True,
+    }
+    if get_http_block_cache() is None:
+        fs = PooledHTTPFileSystem(**fs_kwargs)
+    else:
+        fs = BlockCachedPooledHTTPFileSystem(**fs_kwargs)
+    pool = HttpPool(host=host, authenticated=fractal_token is not None, fs=fs)
+    logger.info(
+        f"Created HTTP pool for {host} "
+        f"(authenticated={pool.authenticated}, size={config.http_pool_size})."
+    )
+    return pool
+
+
+def _release_store(pool: HttpPool) -> None:
+    """Finalizer of the stores, closing their pool if it was evicted."""
+    with _pools_lock:
+        pool.num_stores -= 1
+        if pool.evicted and pool.num_stores == 0:
+            _pools_to_close.append(pool)
+
+
+def _close_pool(pool: HttpPool) -> None:
+    """Close the aiohttp session (and connections) of an evicted pool.
+
+    This is only called once no store of the pool is alive. The filesystem
+    stays usable (e.g. by the `ngio` containers opened from the stores): a new
+    session is created on its next request.
+    """
+    session = pool.fs._session
+    pool.fs._session = None
+    if session is not None and not session.closed:
+        try:
+            sync(session.close())
+        except Exception as e:
+            logger.warning(f"Could not close the HTTP session of {pool.host}: {e}")
+    logger.info(
+        f"Closed HTTP pool for {pool.host} (authenticated={pool.authenticated})."
+    )
+
+
+async def _find_zarr_metadata(fs: HTTPFileSystem, url: str) -> bytes | None:
+    """Look for the zarr metadata at the root of the URL."""
+    possible_keys = [".zgroup", ".zarray"]
+    for key in possible_keys:
+        try:
+            return await fs._cat_file(f"{url}/{key}")
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def check_http_access(url: str, fractal_token: str | None = None) -> HttpPool:
+    """Check that the zarr metadata at the URL can be read with the token.
+
+    The checks are the same as in `ngio.utils.fractal_fsspec_store`, and
+    `NgioValueError` is raised if the URL can not be read.
+    """
+    pool = _get_pool(url, fractal_token=fractal_token)
+    try:
+        value = sync(_find_zarr_metadata(pool.fs, url))
+    except aiohttp.ClientResponseError as e:
+        if e.status == 401 and fractal_token is None:
+            raise NgioValueError(
+                "No auto token is provided. You need a valid "
+                f"'fractal_token' to access: {url}."
+            ) from e
+        elif e.status == 401 and fractal_token is not None:
+            raise NgioValueError(
+                f"The 'fractal_token' provided is invalid for: {url}."
+            ) from e
+        else:
+            raise e
+
+    if value is None:
+        raise NgioValueError(
+            f"Store {url} can not be read. Possible problems are: \n"
+            "- The url does not exist. \n"
+            "- The url is not a valid .zarr. \n"
+        )
+    return pool
+
+
+def pooled_fsspec_store(
+    url: str, fractal_token: str | None = None
+) -> fsspec.mapping.FSMap:
+    """Get an http fsspec store from a url, using the shared pool of its host.
+
+    The store is validated with the same checks as `ngio.utils.fractal_fsspec_store`.
+    """
+    pool = check_http_access(url, fractal_token=fractal_token)
+    store = pool.fs.get_mapper(url)
+    with _pools_lock:
+        pool.num_stores += 1
+    weakref.finalize(store, _release_store, pool)
+    return store
+
+
+def get_http_pools_stats() -> list[HttpPoolStats]:
+    """Get the connection statistics of all the HTTP pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    stats = []
+    for pool in pools:
+        session = pool.fs._session
+        connector = session.connector if session is not None else None
+        if connector is None:
+            limit, open_connections, active_connections = None, 0, 0
+        else:
+            limit = connector.limit
+            idle = getattr(connector, "_conns", {})
+            active_connections = len(getattr(connector, "_acquired", ()))
+            open_connections = active_connections + sum(
+                len(conns) for conns in idle.values()
+            )
+        stats.append(
+            HttpPoolStats(
+                host=pool.host,
+                authenticated=pool.authenticated,
+                num_stores=pool.num_stores,
+                limit=limit,
+                open_connections=open_connections,
+                active_connections=active_connections,
+            )
+        )
+    return stats
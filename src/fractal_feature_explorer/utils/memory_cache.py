@@ -0,0 +1,569 @@
+"""A byte-budgeted, least-recently-used in-memory cache for the cached loaders.
+
+The streamlit caches can only be bounded by a number of entries, which is
+meaningless when an entry can be a small condition table or a feature table
+of several GB. This cache measures the size of each entry (see
+`estimate_size`) and evicts the least recently used entries to stay under a
+byte budget.
+
+`cache_max_bytes` is the global budget of all the entries. The functions
+listed in `cache_function_max_bytes` also get their own pool, with its own
+budget counted inside the global one, all the other functions share the
+default pool. When the global budget is exceeded, the pool receiving an entry
+evicts its own entries first, so that e.g. image crops do not push out feature
+tables while the crops pool still has entries to evict.
+
+Tables not accessed for `cache_compress_after` seconds are compressed in
+memory (Arrow IPC with LZ4 or ZSTD) by a background thread, and only their
+compressed size counts towards the budget. They are decompressed on the next
+access. Tables still referenced outside of the cache (e.g. the value of a
+resource function, or a copy of a data function value kept in a session
+state, which shares the table buffers) are not compressed: compressing them
+would not free their memory.
+"""
+
+import copy
+import dataclasses
+import io
+import math
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+import polars as pl
+from streamlit.logger import get_logger
+from streamlit.time_util import time_to_seconds
+
+from fractal_feature_explorer.config import get_config
+
+logger = get_logger(__name__)
+
+DEFAULT_POOL = "default"
+
+# Smaller tables are not worth compressing, the IPC framing would dominate
+MIN_COMPRESSED_SIZE = 1024**2
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory footprint of a cached value in bytes."""
+    if isinstance(value, pl.DataFrame):
+        return value.estimated_size()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame | pd.Series):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, list | tuple | set | frozenset):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(
+            estimate_size(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+        )
+    return sys.getsizeof(value)
+
+
+def copy_value(value: Any) -> Any:
+    """Copy a cached value, so that callers can not modify the cached one."""
+    if isinstance(value, pl.DataFrame):
+        # Polars data is immutable, cloning does not copy the data
+        return value.clone()
+    return copy.deepcopy(value)
+
+
+def compress_table(
+    table: pl.DataFrame, compression: Literal["lz4", "zstd"] = "zstd"
+) -> bytes:
+    """Compress a table to Arrow IPC bytes."""
+    buffer = io.BytesIO()
+    table.write_ipc(buffer, compression=compression)
+    return buffer.getvalue()
+
+
+def decompress_table(data: bytes) -> pl.DataFrame:
+    """Decompress a table compressed with `compress_table`."""
+    return pl.read_ipc(io.BytesIO(data))
+
+
+@dataclass
+class MemoryCacheEntry:
+    """A cached value and its bookkeeping.
+
+    If the entry is compressed, `value` holds the Arrow IPC bytes of the table
+    and `uncompressed_size` its size before compression.
+    """
+
+    value: Any
+    size: int
+    func_name: str
+    created_at: float
+    accessed_at: float
+    uncompressed_size: int | None = None
+    compressible: bool = True
+    # Set while a compression pass is compressing the entry
+    compressing: bool = False
+    # The URLs and the table the value was read from (see `put`)
+    urls: tuple[str, ...] = ()
+    table_name: str | None = None
+    hits: int = 0
+    # The copies of the value handed out to the callers (see `track_copy`)
+    copies: list[weakref.ref] = field(default_factory=list)
+
+    @property
+    def compressed(self) -> bool:
+        return self.uncompressed_size is not None
+
+    @property
+    def copied(self) -> bool:
+        """Whether a copy of the value handed out to a caller is still alive."""
+        self.copies = [copy for copy in self.copies if copy() is not None]
+        return len(self.copies) > 0
+
+
+@dataclass
+class MemoryFunctionStats:
+    """Statistics of the entries of a function in the memory cache."""
+
+    func_name: str
+    num_entries: int = 0
+    total_bytes: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class MemoryPoolStats:
+    """Statistics of a pool of the memory cache."""
+
+    name: str
+    max_bytes: int | None
+    num_entries: int
+    total_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    num_compressed: int
+    compressed_bytes: int
+    uncompressed_bytes: int
+    decompressions: int
+    decompression_seconds: float
+
+    @property
+    def compression_ratio(self) -> float | None:
+        """Uncompressed over compressed size of the compressed entries."""
+        if self.compressed_bytes == 0:
+            return None
+        return self.uncompressed_bytes / self.compressed_bytes
+
+    @property
+    def mean_decompression_seconds(self) -> float | None:
+        if self.decompressions == 0:
+            return None
+        return self.decompression_seconds / self.decompressions
+
+
+class _Pool:
+    def __init__(self, name: str, max_bytes: int | None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, MemoryCacheEntry] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.decompressions = 0
+        self.decompression_seconds = 0.0
+
+    def pop(self, key: str) -> MemoryCacheEntry:
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry.size
+        return entry
+
+
+def _referenced_elsewhere(entry: MemoryCacheEntry) -> bool:
+    """Check if the value of an entry (or a copy of it) is used outside the cache.
+
+    The only expected references are the entry attribute and the argument of
+    `sys.getrefcount`.
+    """
+    return sys.getrefcount(entry.value) > 2 or entry.copied
+
+
+class MemoryLRUCache:
+    """A thread-safe LRU cache of objects, bounded by a total size per pool."""
+
+    def __init__(
+        self,
+        max_bytes: int | None,
+        pools_max_bytes: dict[str, int] | None = None,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        compress_after: float | None = None,
+        compression: Literal["lz4", "zstd"] = "zstd",
+    ):
+        self._lock = threading.Lock()
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._functions_max_entries: dict[str, int] = {}
+        self._ttl = math.inf if ttl is None else ttl
+        self._compress_after = compress_after
+        self._compression: Literal["lz4", "zstd"] = compression
+        self._evictions_by_func: dict[str, int] = {}
+        self._compress_thread: threading.Thread | None = None
+        self._pools = {DEFAULT_POOL: _Pool(DEFAULT_POOL, max_bytes)}
+        for name, pool_max_bytes in (pools_max_bytes or {}).items():
+            self._pools[name] = _Pool(name, pool_max_bytes)
+        pools_bytes = sum((pools_max_bytes or {}).values())
+        if max_bytes is not None and pools_bytes >= max_bytes:
+            logger.warning(
+                f"The functions budgets ({pools_bytes} bytes) are not smaller than "
+                f"the global budget ({max_bytes} bytes), the default pool can be "
+                "left without budget."
+            )
+
+    def pool_name(self, func_name: str) -> str:
+        """Get the name of the pool holding the entries of a function."""
+        return func_name if func_name in self._pools else DEFAULT_POOL
+
+    def get(self, func_name: str, key: str) -> tuple[bool, Any]:
+        """Get an entry, returns whether it was found and its value."""
+        now = time.time()
+        with self._lock:
+            pool = self._pools[self.pool_name(func_name)]
+            entry = pool.entries.get(key)
+            if entry is not None and now - entry.created_at > self._ttl:
+                pool.pop(key)
+                entry = None
+            if entry is None:
+                pool.misses += 1
+                return False, None
+            pool.entries.move_to_end(key)
+            pool.hits += 1
+            entry.hits += 1
+            entry.accessed_at = now
+        if entry.compressed:
+            return True, self._decompress(pool, key, entry)
+        self._schedule_compression()
+        return True, entry.value
+
+    def _decompress(self, pool: _Pool, key: str, entry: MemoryCacheEntry) -> Any:
+        start = time.perf_counter()
+        value = decompress_table(entry.value)
+        elapsed = time.perf_counter() - start
+        logger.debug(
+            f"Decompressed a result of {entry.func_name} in {elapsed:.3f}s "
+            f"({entry.size / 1024**2:.1f} MB -> "
+            f"{(entry.uncompressed_size or 0) / 1024**2:.1f} MB)."
+        )
+        with self._lock:
+            pool.decompressions += 1
+            pool.decompression_seconds += elapsed
+            if pool.entries.get(key) is entry:
+                self._replace(pool, key, entry, value, entry.uncompressed_size or 0)
+                self._evict(pool)
+        return value
+
+    def _replace(
+        self,
+        pool: _Pool,
+        key: str,
+        entry: MemoryCacheEntry,
+        value: Any,
+        size: int,
+        uncompressed_size: int | None = None,
+    ) -> None:
+        pool.total_bytes += size - entry.size
+        entry.value = value
+        entry.size = size
+        entry.uncompressed_size = uncompressed_size
+
+    def put(
+        self,
+        func_name: str,
+        key: str,
+        value: Any,
+        urls: tuple[str, ...] = (),
+        table_name: str | None = None,
+    ) -> None:
+        """Add an entry, evicting the least recently used ones if needed.
+
+        `urls` and `table_name` describe the sources of the value, to list and
+        evict the entries of a plate (see `entries` and `evict_entries`).
+        """
+        size = estimate_size(value)
+        now = time.time()
+        with self._lock:
+            pool = self._pools[self.pool_name(func_name)]
+            max_bytes = min(
+                (b for b in (pool.max_bytes, self._max_bytes) if b is not None),
+                default=None,
+            )
+            if max_bytes is not None and size > max_bytes:
+                logger.warning(
+                    f"Not caching a {size / 1024**2:.1f} MB result of {func_name}, "
+                    f"larger than the {pool.name!r} cache budget."
+                )
+                return
+            if key in pool.entries:
+                pool.pop(key)
+            pool.entries[key] = MemoryCacheEntry(
+                value=value,
+                size=size,
+                func_name=func_name,
+                created_at=now,
+                accessed_at=now,
+                urls=urls,
+                table_name=table_name,
+            )
+            pool.total_bytes += size
+            func_max_entries = self._functions_max_entries.get(func_name)
+            if func_max_entries is not None:
+                num_entries = sum(
+                    entry.func_name == func_name for entry in pool.entries.values()
+                )
+                for _ in range(num_entries - func_max_entries):
+                    self._evict_oldest(pool, func_name)
+            self._evict(pool)
+        self._schedule_compression()
+
+    def set_max_entries(self, func_name: str, max_entries: int) -> None:
+        """Bound the number of entries of a function (e.g. of large resources)."""
+        with self._lock:
+            self._functions_max_entries[func_name] = max_entries
+
+    def track_copy(self, func_name: str, key: str, value: Any) -> None:
+        """Record a copy of an entry value handed out to a caller.
+
+        Cloned tables share the buffers of the cached table, so the entry is
+        not compressed while the copy is alive.
+        """
+        if not isinstance(value, pl.DataFrame):
+            return
+        with self._lock:
+            entry = self._pools[self.pool_name(func_name)].entries.get(key)
+            if entry is not None and not entry.compressed:
+                entry.copies.append(weakref.ref(value))
+
+    def _schedule_compression(self) -> None:
+        """Compress the cold tables in a background thread, if none is running."""
+        if self._compress_after is None:
+            return
+        with self._lock:
+            if self._compress_thread is not None and self._compress_thread.is_alive():
+                return
+            self._compress_thread = threading.Thread(
+                target=self.compress_cold_entries,
+                name="memory-cache-compression",
+                daemon=True,
+            )
+            self._compress_thread.start()
+
+    def wait_for_compression(self, timeout: float | None = None) -> None:
+        """Wait for the background compression pass (if any) to finish."""
+        thread = self._compress_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def compress_cold_entries(self) -> None:
+        """Compress the tables not accessed for `compress_after` seconds.
+
+        The entries are marked as being compressed, so that concurrent passes
+        do not compress the same entry twice.
+        """
+        if self._compress_after is None:
+            return
+        cold_before = time.time() - self._compress_after
+        with self._lock:
+            # The entries are in access order, the cold ones come first
+            cold = []
+            for pool in self._pools.values():
+                for key, entry in pool.entries.items():
+                    if entry.accessed_at >= cold_before:
+                        break
+                    if (
+                        entry.compressible
+                        and not entry.compressed
+                        and not entry.compressing
+                        and entry.size >= MIN_COMPRESSED_SIZE
+                        and isinstance(entry.value, pl.DataFrame)
+                        and not _referenced_elsewhere(entry)
+                    ):
+                        entry.compressing = True
+                        cold.append((pool, key, entry, entry.value))
+
+        for pool, key, entry, table in cold:
+            try:
+                data = compress_table(table, compression=self._compression)
+            except Exception as e:
+                logger.warning(f"Could not compress a result of {entry.func_name}: {e}")
+                data = None
+            with self._lock:
+                entry.compressing = False
+                if data is None or len(data) >= entry.size:
+                    entry.compressible = False
+                    continue
+                # Skip the entries replaced or copied in the meantime
+                if (
+                    pool.entries.get(key) is not entry
+                    or entry.value is not table
+                    or entry.copied
+                ):
+                    continue
+                self._replace(pool, key, entry, data, len(data), entry.size)
+            logger.debug(
+                f"Compressed a result of {entry.func_name} "
+                f"({entry.uncompressed_size / 1024**2:.1f} MB -> "
+                f"{len(data) / 1024**2:.1f} MB)."
+            )
+
+    def _evict(self, pool: _Pool) -> None:
+        while pool.entries and (
+            (pool.max_bytes is not None and pool.total_bytes > pool.max_bytes)
+            or (self._max_entries is not None and len(pool.entries) > self._max_entries)
+        ):
+            self._evict_oldest(pool)
+
+        if self._max_bytes is None:
+            return
+        # The global budget: the pool evicts its own entries first (except the
+        # last one, just added or accessed), then the least recently used
+        # entries of the other pools
+        while sum(p.total_bytes for p in self._pools.values()) > self._max_bytes:
+            if len(pool.entries) > 1:
+                victim = pool
+            else:
+                victim = self._least_recently_used_pool(exclude=pool)
+            if victim is None:
+                return
+            self._evict_oldest(victim)
+
+    def _least_recently_used_pool(self, exclude: _Pool) -> _Pool | None:
+        pools = [p for p in self._pools.values() if p.entries and p is not exclude]
+        return min(
+            pools,
+            key=lambda p: next(iter(p.entries.values())).accessed_at,
+            default=None,
+        )
+
+    def _evict_oldest(self, pool: _Pool, func_name: str | None = None) -> None:
+        key = next(
+            key
+            for key, entry in pool.entries.items()
+            if func_name is None or entry.func_name == func_name
+        )
+        entry = pool.pop(key)
+        pool.evictions += 1
+        self._evictions_by_func[entry.func_name] = (
+            self._evictions_by_func.get(entry.func_name, 0) + 1
+        )
+        logger.debug(
+            f"Evicted a {entry.size / 1024**2:.1f} MB result of "
+            f"{entry.func_name} from the {pool.name!r} cache."
+        )
+
+    def entries(self) -> list[tuple[str, MemoryCacheEntry]]:
+        """Get the (pool name, entry) of all the entries."""
+        with self._lock:
+            return [
+                (pool.name, copy.copy(entry))
+                for pool in self._pools.values()
+                for entry in pool.entries.values()
+            ]
+
+    def evict(self, func_name: str, key: str) -> bool:
+        """Remove an entry, returns whether it was cached."""
+        with self._lock:
+            pool = self._pools[self.pool_name(func_name)]
+            if key not in pool.entries:
+                return False
+            pool.pop(key)
+            return True
+
+    def evict_entries(self, predicate: Callable[[MemoryCacheEntry], bool]) -> int:
+        """Remove the entries matching the predicate, returns their number."""
+        with self._lock:
+            num_evicted = 0
+            for pool in self._pools.values():
+                for key, entry in list(pool.entries.items()):
+                    if predicate(entry):
+                        pool.pop(key)
+                        num_evicted += 1
+            return num_evicted
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.entries.clear()
+                pool.total_bytes = 0
+
+    def function_stats(self) -> list[MemoryFunctionStats]:
+        """Get the statistics of the entries of each function."""
+        with self._lock:
+            stats = {
+                func_name: MemoryFunctionStats(func_name, evictions=evictions)
+                for func_name, evictions in self._evictions_by_func.items()
+            }
+            for pool in self._pools.values():
+                for entry in pool.entries.values():
+                    func_stats = stats.setdefault(
+                        entry.func_name, MemoryFunctionStats(entry.func_name)
+                    )
+                    func_stats.num_entries += 1
+                    func_stats.total_bytes += entry.size
+        return list(stats.values())
+
+    def stats(self) -> list[MemoryPoolStats]:
+        """Get the statistics of each pool."""
+        with self._lock:
+            return [
+                MemoryPoolStats(
+                    name=pool.name,
+                    max_bytes=pool.max_bytes,
+                    num_entries=len(pool.entries),
+                    total_bytes=pool.total_bytes,
+                    hits=pool.hits,
+                    misses=pool.misses,
+                    evictions=pool.evictions,
+                    num_compressed=sum(e.compressed for e in pool.entries.values()),
+                    compressed_bytes=sum(
+                        e.size for e in pool.entries.values() if e.compressed
+                    ),
+                    uncompressed_bytes=sum(
+                        e.uncompressed_size or 0 for e in pool.entries.values()
+                    ),
+                    decompressions=pool.decompressions,
+                    decompression_seconds=pool.decompression_seconds,
+                )
+                for pool in self._pools.values()
+            ]
+
+
+_memory_cache: MemoryLRUCache | None = None
+_memory_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> MemoryLRUCache:
+    """Get the shared byte-budgeted cache of the cached loaders."""
+    global _memory_cache
+    with _memory_cache_lock:
+        if _memory_cache is None:
+            config = get_config()
+            _memory_cache = MemoryLRUCache(
+                max_bytes=config.cache_max_bytes,
+                pools_max_bytes=config.cache_function_max_bytes,
+                max_entries=config.cache_max_entries,
+                ttl=time_to_seconds(config.cache_ttl),
+                compress_after=config.cache_compress_after,
+                compression=config.cache_compression,
+            )
+        return _memory_cache
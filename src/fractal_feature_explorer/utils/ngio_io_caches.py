@@ -1,4 +1,5 @@
-import asyncio
+import threading
+import time
 from collections.abc import Iterable
 from pathlib import Path
 from typing import Literal
@@ -19,7 +20,7 @@ from ngio.common._zoom import numpy_zoom
 from ngio.images._table_ops import list_image_tables_async
 from ngio.ome_zarr_meta.ngio_specs import PixelSize
 from ngio.tables import MaskingRoiTable
-from ngio.utils import NgioValueError, fractal_fsspec_store
+from ngio.utils import NgioValueError
 from streamlit.logger import get_logger
 
 from fractal_feature_explorer.config import (
@@ -28,6 +29,12 @@ from fractal_feature_explorer.config import (
     st_cache_resource_wrapper,
 )
 from fractal_feature_explorer.utils import get_fractal_token
+from fractal_feature_explorer.utils.consolidated_metadata import consolidated_store
+from fractal_feature_explorer.utils.event_loop import run_coroutine
+from fractal_feature_explorer.utils.http_pool import (
+    check_http_access,
+    pooled_fsspec_store,
+)
 
 logger = get_logger(__name__)
 
@@ -83,7 +90,7 @@ def _get_http_store(
     """Ping the URL to check if it is reachable."""
     try:
         logger.info(f"Attempting to open URL: {url}")
-        store = fractal_fsspec_store(url, fractal_token=fractal_token)
+        store = pooled_fsspec_store(url, fractal_token=fractal_token)
     except NgioValueError as e:
         st.error(e)
         logger.error(e)
@@ -91,29 +98,35 @@ def _get_http_store(
     return store
 
 
-def get_http_store(
-    url: str, fractal_token: str | None = None
-) -> fsspec.mapping.FSMap | None:
-    """Ping the URL to check if it is reachable."""
+def _http_url_error(url: str) -> str | None:
+    """Get the reason why the URL is not allowed, or None if it is allowed."""
     config = get_config()
     if config.deployment_type == "production":
-        msg = None
         scheme = urllib3.util.parse_url(url).scheme
         if scheme != "https" and not (scheme == "http" and config.allow_http):
-            msg = f"Non-https URLs are not supported (provided: {url})."
-        if msg is None and not _url_belongs_to_base(url, config.fractal_data_url):
-            msg = f"URLs must be part of {config.fractal_data_url} (provided: {url})."
-        if msg is not None:
-            logger.error(msg)
-            st.error(msg)
-            return None
+            return f"Non-https URLs are not supported (provided: {url})."
+        if not _url_belongs_to_base(url, config.fractal_data_url):
+            return f"URLs must be part of {config.fractal_data_url} (provided: {url})."
+    return None
+
 
+def _token_for_url(url: str, fractal_token: str | None = None) -> str | None:
+    """Do not use a fractal token for non-Fractal URLs."""
     include_token = _include_token_for_url(url)
     logger.debug(f"get_http_store: {url=}, {include_token=}")
-    if not include_token:
-        # Do not use a fractal token for non-Fractal URLs
-        fractal_token = None
-    return _get_http_store(url, fractal_token=fractal_token)
+    return fractal_token if include_token else None
+
+
+def get_http_store(
+    url: str, fractal_token: str | None = None
+) -> fsspec.mapping.FSMap | None:
+    """Ping the URL to check if it is reachable."""
+    msg = _http_url_error(url)
+    if msg is not None:
+        logger.error(msg)
+        st.error(msg)
+        return None
+    return _get_http_store(url, fractal_token=_token_for_url(url, fractal_token))
 
 
 def get_path(url: str) -> str | None:
@@ -145,17 +158,76 @@ def _get_and_validate_store(
     return get_path(url)
 
 
+# (URL, token) -> time of the last successful access check
+_access_checks: dict[tuple[str, str | None], float] = {}
+_access_checks_lock = threading.Lock()
+
+
+def _access_checked(url: str, fractal_token: str | None, ttl: float) -> bool:
+    """Check if the URL, or one of its parents, was accessible recently."""
+    now = time.time()
+    with _access_checks_lock:
+        parent = url
+        while parent:
+            checked_at = _access_checks.get((parent, fractal_token))
+            if checked_at is not None and now - checked_at < ttl:
+                return True
+            parent = parent.rpartition("/")[0]
+    return False
+
+
+def check_access(url: str, fractal_token: str | None = None) -> None:
+    """Check that the user with this token is allowed to read the URL.
+
+    This is the authorization of the caches shared by all users (see the
+    `authorize` argument of `st_cache_data_wrapper`). Successful checks are
+    cached for `access_check_ttl` seconds, and also grant access to all the
+    sub-paths of the URL (e.g. the images of a plate).
+    """
+    config = get_config()
+    if not is_http_url(url):
+        if not config.allow_local_paths:
+            msg = "Local paths are not allowed in this configuration."
+            st.error(msg)
+            logger.error(msg)
+            raise NgioValueError(msg)
+        return
+
+    fractal_token = _token_for_url(url, fractal_token)
+    if _access_checked(url, fractal_token, ttl=config.access_check_ttl):
+        return
+
+    msg = _http_url_error(url)
+    if msg is not None:
+        st.error(msg)
+        logger.error(msg)
+        raise NgioValueError(msg)
+    try:
+        check_http_access(url, fractal_token=fractal_token)
+    except NgioValueError as e:
+        st.error(e)
+        logger.error(e)
+        raise e
+    with _access_checks_lock:
+        _access_checks[(url, fractal_token)] = time.time()
+
+
 def get_and_validate_store(url: str) -> fsspec.mapping.FSMap | str | None:
     """Get the store for the given URL."""
     fractal_token = get_fractal_token()
     return _get_and_validate_store(url, fractal_token=fractal_token)
 
 
-@st_cache_resource_wrapper
+@st_cache_resource_wrapper(source="url")
 def _get_ome_zarr_plate(url: str, fractal_token: str | None = None) -> OmeZarrPlate:
     store = _get_and_validate_store(url, fractal_token=fractal_token)
     if store is None:
         raise ValueError(f"Could not get store for URL: {url}")
+    if (
+        isinstance(store, fsspec.mapping.FSMap)
+        and get_config().use_consolidated_metadata
+    ):
+        store = consolidated_store(store)
     plate = open_ome_zarr_plate(store, cache=True, mode="r")
     return plate
 
@@ -165,7 +237,7 @@ def get_ome_zarr_plate(url: str) -> OmeZarrPlate:
     return _get_ome_zarr_plate(url, fractal_token=fractal_token)
 
 
-@st_cache_resource_wrapper
+@st_cache_resource_wrapper(source="url")
 def _get_ome_zarr_image_container(
     url: str, fractal_token: str | None = None
 ) -> OmeZarrContainer:
@@ -176,18 +248,30 @@ def _get_ome_zarr_image_container(
     return container
 
 
+@st_cache_resource_wrapper(source="plate_url")
+def _get_plate_images_index(
+    plate_url: str, fractal_token: str | None = None
+) -> dict[str, OmeZarrContainer]:
+    """Map the `row/col/path_in_well` paths of a plate to their containers."""
+    plate = _get_ome_zarr_plate(plate_url, fractal_token=fractal_token)
+    images = run_coroutine(plate.get_images_async())
+    logger.info(f"Built images index for plate {plate_url} ({len(images)} images).")
+    return images
+
+
 def _get_ome_zarr_container_in_plate(
     url: str, fractal_token: str | None = None
 ) -> OmeZarrContainer:
     *_plate_url, row, col, path_in_well = url.split("/")
     plate_url = "/".join(_plate_url)
-    plate = _get_ome_zarr_plate(plate_url, fractal_token=fractal_token)
-    images = asyncio.run(plate.get_images_async())
+    images = _get_plate_images_index(plate_url, fractal_token=fractal_token)
     path = f"{row}/{col}/{path_in_well}"
+    if path not in images:
+        raise ValueError(f"Image {path} not found in plate {plate_url}.")
     return images[path]
 
 
-@st_cache_resource_wrapper
+@st_cache_resource_wrapper(source="url")
 def _get_ome_zarr_container(
     url: str,
     fractal_token: str | None = None,
@@ -209,7 +293,7 @@ def get_ome_zarr_container(
     return _get_ome_zarr_image_container(url, fractal_token=fractal_token)
 
 
-@st_cache_data_wrapper
+@st_cache_data_wrapper(source="urls", source_path="tables", authorize="urls")
 def _list_image_tables(
     urls: list[str],
     fractal_token: str | None = None,
@@ -219,7 +303,7 @@ def _list_image_tables(
         _get_ome_zarr_container(url, fractal_token=fractal_token, mode=mode)
         for url in urls
     ]
-    image_list = asyncio.run(list_image_tables_async(images))
+    image_list = run_coroutine(list_image_tables_async(images))
     return image_list
 
 
@@ -256,7 +340,9 @@ def roi_to_slice_kwargs(
     return raster_roi  # type: ignore
 
 
-@st_cache_resource_wrapper
+@st_cache_resource_wrapper(
+    source="image_url", source_path="tables", authorize="image_url"
+)
 def _get_masking_roi(
     image_url: str,
     ref_label: str,
@@ -279,7 +365,7 @@ def _get_masking_roi(
     return masking_roi
 
 
-@st_cache_data_wrapper
+@st_cache_data_wrapper(source="image_url", authorize="image_url")
 def _get_image_array(
     image_url: str,
     ref_label: str,
@@ -320,7 +406,9 @@ def _get_image_array(
     return image_array
 
 
-@st_cache_data_wrapper
+@st_cache_data_wrapper(
+    source="image_url", source_path="labels/{ref_label}", authorize="image_url"
+)
 def _get_label_array(
     image_url: str,
     ref_label: str,
@@ -0,0 +1,185 @@
+"""Plate manifest files, written by `explorer index`.
+
+A manifest is a single JSON file describing a plate: its images paths and the
+catalog of its plate-level and image-level tables (see `tables_catalog`).
+When a fresh manifest is available, the setup page reads it instead of
+opening every image and table of the plate.
+
+Manifests are stored in the `plate_index_dir` directory if it is set in the
+config, and next to the plate metadata otherwise. A manifest is fresh if the
+plate metadata, the wells metadata and the tables groups of the plate and of
+its images did not change since it was written (see `source_fingerprint`), and
+if it is not older than `plate_manifest_max_age` seconds.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from streamlit.logger import get_logger
+from zarr.core.sync import sync
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.ngio_io_caches import (
+    _get_and_validate_store,
+    is_http_url,
+)
+from fractal_feature_explorer.utils.source_fingerprint import nodes_fingerprints
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE_NAME = "explorer_manifest.json"
+MANIFEST_VERSION = 2
+
+# Root metadata files of a zarr v2 and v3 group
+_PLATE_METADATA_FILES = (".zattrs", "zarr.json")
+
+
+def _read_plate_file(
+    plate_url: str, name: str, fractal_token: str | None = None
+) -> bytes | None:
+    """Read a file at the root of the plate, or None if it does not exist."""
+    if not is_http_url(plate_url):
+        path = Path(plate_url) / name
+        return path.read_bytes() if path.is_file() else None
+
+    store = _get_and_validate_store(plate_url, fractal_token=fractal_token)
+    if store is None:
+        raise ValueError(f"Could not get store for URL: {plate_url}")
+    try:
+        return sync(store.fs._cat_file(f"{store.root}/{name}"))
+    except (FileNotFoundError, aiohttp.ClientResponseError):
+        return None
+
+
+def _plate_metadata_hash(plate_url: str, fractal_token: str | None = None) -> str:
+    """Hash the root metadata of the plate (wells and acquisitions list)."""
+    for name in _PLATE_METADATA_FILES:
+        metadata = _read_plate_file(plate_url, name, fractal_token=fractal_token)
+        if metadata is not None:
+            return hashlib.sha256(metadata).hexdigest()
+    raise ValueError(f"Plate {plate_url} does not contain any zarr metadata.")
+
+
+def _plate_nodes_hash(
+    plate_url: str, images_paths: list[str], fractal_token: str | None = None
+) -> str:
+    """Hash the fingerprints of the wells and of the tables groups of the plate.
+
+    A table or an image written under a well changes the metadata of the
+    tables group or of the well, not the root metadata of the plate.
+    """
+    wells_paths = dict.fromkeys(path.rsplit("/", 1)[0] for path in images_paths)
+    paths = [
+        "tables",
+        *wells_paths,
+        *(f"{path}/tables" for path in images_paths),
+    ]
+    fingerprints = nodes_fingerprints(plate_url, paths, fractal_token=fractal_token)
+    return hashlib.sha256(json.dumps(fingerprints).encode()).hexdigest()
+
+
+def _index_dir_path(plate_url: str) -> Path | None:
+    """Path of the manifest of the plate in the index directory (if configured)."""
+    index_dir = get_config().plate_index_dir
+    if index_dir is None:
+        return None
+    url_hash = hashlib.sha256(plate_url.encode()).hexdigest()[:16]
+    plate_name = plate_url.rstrip("/").rsplit("/", 1)[-1]
+    return Path(index_dir).expanduser() / f"{plate_name}-{url_hash}.json"
+
+
+def _read_manifest_file(
+    plate_url: str, fractal_token: str | None = None
+) -> dict[str, Any] | None:
+    """Read the manifest from the index directory, or from next to the plate."""
+    index_path = _index_dir_path(plate_url)
+    if index_path is not None and index_path.is_file():
+        return json.loads(index_path.read_bytes())
+
+    data = _read_plate_file(plate_url, MANIFEST_FILE_NAME, fractal_token=fractal_token)
+    if data is None:
+        return None
+    return json.loads(data)
+
+
+def read_plate_manifest(
+    plate_url: str, fractal_token: str | None = None
+) -> dict[str, Any] | None:
+    """Read the manifest of a plate, or None if there is no fresh manifest."""
+    try:
+        manifest = _read_manifest_file(plate_url, fractal_token=fractal_token)
+    except Exception as e:
+        logger.warning(f"Could not read the manifest of plate {plate_url}: {e}")
+        return None
+    if manifest is None:
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.info(f"Ignoring manifest of plate {plate_url} (unsupported version).")
+        return None
+
+    max_age = get_config().plate_manifest_max_age
+    age = time.time() - manifest.get("created_at", 0)
+    if max_age is not None and age > max_age:
+        logger.info(f"Ignoring manifest of plate {plate_url} (older than {max_age}s).")
+        return None
+
+    try:
+        metadata_hash = _plate_metadata_hash(plate_url, fractal_token=fractal_token)
+        nodes_hash = _plate_nodes_hash(
+            plate_url, manifest["images_paths"], fractal_token=fractal_token
+        )
+    except Exception as e:
+        logger.warning(f"Could not read the metadata of plate {plate_url}: {e}")
+        return None
+    if manifest.get("plate_metadata_hash") != metadata_hash:
+        logger.info(f"Ignoring manifest of plate {plate_url} (plate changed).")
+        return None
+    if manifest.get("plate_nodes_hash") != nodes_hash:
+        logger.info(
+            f"Ignoring manifest of plate {plate_url} (wells or tables changed)."
+        )
+        return None
+
+    logger.info(f"Using manifest of plate {plate_url} (written {age:.0f}s ago).")
+    return manifest
+
+
+def write_plate_manifest(
+    plate_url: str, content: dict[str, Any], fractal_token: str | None = None
+) -> str:
+    """Write the manifest of a plate, and return where it was written.
+
+    `content` holds the plate description (images paths and tables), the
+    version, creation time and plate metadata and nodes hashes are added here.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": time.time(),
+        "plate_metadata_hash": _plate_metadata_hash(
+            plate_url, fractal_token=fractal_token
+        ),
+        "plate_nodes_hash": _plate_nodes_hash(
+            plate_url, content["images_paths"], fractal_token=fractal_token
+        ),
+        **content,
+    }
+
+    path = _index_dir_path(plate_url)
+    if path is None:
+        if is_http_url(plate_url):
+            raise ValueError(
+                f"Can not write a manifest next to the remote plate {plate_url}, "
+                "set `plate_index_dir` in the config to index remote plates."
+            )
+        path = Path(plate_url) / MANIFEST_FILE_NAME
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest))
+    tmp_path.replace(path)
+    return str(path)
@@ -0,0 +1,98 @@
+"""Single-flight deduplication of concurrent identical loads.
+
+When several sessions miss the cache for the same entry at the same time
+(e.g. a plate link shared with a whole lab), only the first one computes the
+value, and the others wait for its result instead of starting their own
+identical downloads. Errors are propagated to all the waiting callers, so a
+failing load is not retried once per waiting session. Other exceptions (e.g.
+the streamlit rerun and stop exceptions of the leader session) are not
+shared: the waiting callers then retry, one of them computing the value.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from streamlit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Flight:
+    """A computation in progress, and its outcome once done."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Exception | None = None
+        self.completed = False
+        self.num_waiters = 0
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_num_deduplicated = 0
+
+
+def single_flight(
+    key: str,
+    func: Callable[[], Any],
+    timeout: float | None = None,
+    share_result: bool = True,
+):
+    """Call `func`, unless a call with the same key is already in progress.
+
+    If it is, wait (at most `timeout` seconds) for the call in progress and
+    return its result, or raise its error. A `TimeoutError` is raised if the
+    call in progress does not complete in time.
+
+    If `share_result` is False, the waiting callers call `func` themselves
+    once the call in progress succeeded, e.g. to get their own copy of the
+    value it cached.
+    """
+    global _num_deduplicated
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            flight.num_waiters += 1
+            _num_deduplicated += 1
+
+    if not leader:
+        start = time.perf_counter()
+        if not flight.done.wait(timeout):
+            raise TimeoutError(
+                f"Timed out after {timeout}s waiting for a concurrent load to complete."
+            )
+        logger.debug(
+            f"Waited {time.perf_counter() - start:.2f}s for a concurrent load ({key})."
+        )
+        if flight.error is not None:
+            raise flight.error
+        if not flight.completed:
+            # The leader was interrupted (e.g. its session reran), retry
+            return single_flight(key, func, timeout=timeout, share_result=share_result)
+        return flight.result if share_result else func()
+
+    try:
+        flight.result = func()
+        flight.completed = True
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+        if flight.num_waiters:
+            logger.info(f"Shared a load with {flight.num_waiters} concurrent callers.")
+
+
+def single_flight_stats() -> dict[str, int]:
+    """Get the number of loads in progress and of deduplicated calls."""
+    with _flights_lock:
+        return {"in_flight": len(_flights), "deduplicated": _num_deduplicated}
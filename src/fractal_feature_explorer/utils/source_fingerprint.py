@@ -0,0 +1,173 @@
+"""Cheap fingerprints of the zarr nodes a cached object was built from.
+
+The fingerprint of a node is built from the metadata document of the node
+(`.zattrs` for zarr v2, `zarr.json` for zarr v3), which is rewritten by
+`ngio` whenever a table or an image is (over)written:
+- the modification time and size of the file for local paths,
+- the `ETag` or `Last-Modified` header of a `HEAD` request for HTTP URLs.
+
+The cached loaders use these fingerprints as part of their cache key (see the
+`source` argument of `st_cache_data_wrapper`), so that only the entries whose
+sources changed are reloaded. Fingerprints are revalidated at most every
+`source_fingerprint_ttl` seconds.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from streamlit.logger import get_logger
+from zarr.core.sync import sync
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.ngio_io_caches import (
+    _get_and_validate_store,
+    is_http_url,
+)
+
+logger = get_logger(__name__)
+
+# Metadata documents of a zarr v2 and v3 node, in lookup order
+_NODE_METADATA_FILES = (".zattrs", "zarr.json")
+
+# Bound of the fingerprints kept, the least recently checked are dropped first
+MAX_FINGERPRINTS = 100_000
+
+# (root URL, node path, token) -> (fingerprint, time of the check)
+_fingerprints: OrderedDict[tuple[str, str, str | None], tuple[str | None, float]] = (
+    OrderedDict()
+)
+_fingerprints_lock = threading.Lock()
+
+
+def _local_fingerprint(node_path: Path) -> str | None:
+    for name in _NODE_METADATA_FILES:
+        try:
+            stat = (node_path / name).stat()
+        except FileNotFoundError:
+            continue
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    return None
+
+
+async def _http_fingerprint(fs, node_url: str) -> str | None:
+    for name in _NODE_METADATA_FILES:
+        try:
+            info = await fs._info(f"{node_url}/{name}")
+        except FileNotFoundError:
+            continue
+        validator = info.get("ETag") or info.get("Last-Modified")
+        if validator is None:
+            # Without a validator the document can only be compared by size
+            return f"size-{info.get('size')}"
+        return validator
+    return None
+
+
+def _check_fingerprints(
+    root_url: str, paths: list[str], fractal_token: str | None = None
+) -> list[str | None]:
+    if not is_http_url(root_url):
+        return [_local_fingerprint(Path(root_url) / path) for path in paths]
+
+    store = _get_and_validate_store(root_url, fractal_token=fractal_token)
+    if store is None:
+        raise ValueError(f"Could not get store for URL: {root_url}")
+
+    def _node_url(path: str) -> str:
+        return f"{store.root}/{path}" if path else store.root
+
+    async def _gather() -> list[str | None]:
+        return await asyncio.gather(
+            *(_http_fingerprint(store.fs, _node_url(path)) for path in paths)
+        )
+
+    return sync(_gather())
+
+
+def nodes_fingerprints(
+    root_url: str,
+    paths: list[str],
+    fractal_token: str | None = None,
+) -> list[str | None]:
+    """Get the fingerprints of the nodes at `paths` (relative to `root_url`).
+
+    Only the fingerprints not checked in the last `source_fingerprint_ttl`
+    seconds are checked again, remote nodes concurrently. The fingerprint of a
+    node is None if it has no metadata document.
+    """
+    ttl = get_config().source_fingerprint_ttl
+    now = time.time()
+    fingerprints: dict[str, str | None] = {}
+    with _fingerprints_lock:
+        for path in paths:
+            checked = _fingerprints.get((root_url, path, fractal_token))
+            if checked is not None and now - checked[1] < ttl:
+                fingerprints[path] = checked[0]
+
+    to_check = [path for path in dict.fromkeys(paths) if path not in fingerprints]
+    if to_check:
+        checked = _check_fingerprints(root_url, to_check, fractal_token=fractal_token)
+        with _fingerprints_lock:
+            for path, fingerprint in zip(to_check, checked, strict=True):
+                key = (root_url, path, fractal_token)
+                _fingerprints[key] = (fingerprint, now)
+                _fingerprints.move_to_end(key)
+                fingerprints[path] = fingerprint
+            while len(_fingerprints) > MAX_FINGERPRINTS:
+                _fingerprints.popitem(last=False)
+    return [fingerprints[path] for path in paths]
+
+
+def source_fingerprint(
+    url: str, path: str = "", fractal_token: str | None = None
+) -> str | None:
+    """Get the fingerprint of the node at `path` (relative to `url`).
+
+    Errors are not raised, the fingerprint is None if it can not be checked.
+    """
+    try:
+        return nodes_fingerprints(url, [path], fractal_token=fractal_token)[0]
+    except Exception as e:
+        logger.debug(f"Could not fingerprint {url} ({path}): {e}")
+        return None
+
+
+def _split_zarr_url(url: str) -> tuple[str, str]:
+    """Split a URL into the root of its zarr (e.g. the plate) and the node path."""
+    match = re.match(r"^(.*?\.zarr)(?:/(.*))?$", url.rstrip("/"))
+    if match is None:
+        return url, ""
+    return match.group(1), match.group(2) or ""
+
+
+def sources_fingerprints(
+    urls: list[str], path: str = "", fractal_token: str | None = None
+) -> list[str | None]:
+    """Get the fingerprints of the node at `path` relative to each of the URLs.
+
+    The nodes are checked with one `nodes_fingerprints` call per zarr root
+    (e.g. all the images of a plate at once), instead of one call per URL.
+    Errors are not raised, the fingerprints of a root are None if they can not
+    be checked.
+    """
+    paths_by_root: dict[str, list[str]] = {}
+    nodes = []
+    for url in urls:
+        root_url, node_path = _split_zarr_url(url)
+        node_path = "/".join(p for p in (node_path, path) if p)
+        paths_by_root.setdefault(root_url, []).append(node_path)
+        nodes.append((root_url, node_path))
+
+    fingerprints: dict[tuple[str, str], str | None] = {}
+    for root_url, paths in paths_by_root.items():
+        try:
+            checked = nodes_fingerprints(root_url, paths, fractal_token=fractal_token)
+        except Exception as e:
+            logger.debug(f"Could not fingerprint the nodes of {root_url}: {e}")
+            checked = [None] * len(paths)
+        fingerprints.update(zip(((root_url, p) for p in paths), checked, strict=True))
+    return [fingerprints[node] for node in nodes]
@@ -0,0 +1,71 @@
+"""Persistent local cache for the assembled feature tables.
+
+The feature tables (after the concatenation of all the plates or images and
+the join with the plate setup table) are stored as uncompressed Arrow IPC
+files in a size-bounded LRU cache on the local disk, shared by all users, and
+memory-mapped back on hit. The server workers and the `explorer warm` command
+can share the cache directory, but each process enforces the size budget on
+its own (see `disk_cache`).
+
+Entries are keyed by the content of the request (plate setup table, table
+name, columns) and by the fingerprints of the table sources, so that an
+entry is never served once its sources have changed.
+"""
+
+import threading
+
+import polars as pl
+from streamlit.logger import get_logger
+
+from fractal_feature_explorer.config import get_config
+from fractal_feature_explorer.utils.disk_cache import DiskLRUCache
+
+logger = get_logger(__name__)
+
+_table_cache: DiskLRUCache | None = None
+_table_cache_lock = threading.Lock()
+
+
+def get_table_disk_cache() -> DiskLRUCache | None:
+    """Get the shared table cache, or None if it is not enabled in the config."""
+    global _table_cache
+    config = get_config()
+    if config.table_disk_cache_dir is None:
+        return None
+
+    with _table_cache_lock:
+        if _table_cache is None:
+            _table_cache = DiskLRUCache(
+                directory=config.table_disk_cache_dir,
+                max_bytes=config.table_disk_cache_max_bytes,
+                suffix=".arrow",
+            )
+        return _table_cache
+
+
+def read_cached_table(cache: DiskLRUCache, key: str) -> pl.DataFrame | None:
+    """Memory-map a table from the cache, or None if it is not cached."""
+    path = cache.get_path(key)
+    if path is None:
+        return None
+    try:
+        # Uncompressed IPC files are memory-mapped by default
+        return pl.read_ipc(path)
+    except Exception as e:
+        logger.warning(f"Could not read cached table {path}: {e}")
+        cache.invalidate(key)
+        return None
+
+
+def write_cached_table(
+    cache: DiskLRUCache, key: str, table: pl.DataFrame, metadata: dict | None = None
+) -> None:
+    """Add a table to the cache."""
+    tmp_path = cache.new_tmp_path(key)
+    try:
+        table.write_ipc(tmp_path, compression="uncompressed")
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.warning(f"Could not write table to the disk cache: {e}")
+        return
+    cache.commit(key, tmp_path, metadata)
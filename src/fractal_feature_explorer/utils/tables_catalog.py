@@ -0,0 +1,374 @@
+"""Catalog of the plate-level and image-level tables of a plate.
+
+The catalog describes every table of a plate and of its images (name, type,
+backend, reference label, number of rows and schema) without loading the
+tables data. It is built once per plate, concurrently for all the images,
+and cached, so that listing the tables available for a selection does not
+walk all the image containers again.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import zarr
+from ngio import OmeZarrContainer, OmeZarrPlate
+from ngio.tables import FeatureTable
+from streamlit.logger import get_logger
+from zarr.abc.store import SuffixByteRequest
+from zarr.core.buffer import default_buffer_prototype
+from zarr.core.sync import sync
+
+from fractal_feature_explorer.config import get_config, st_cache_data_wrapper
+from fractal_feature_explorer.utils.common import get_fractal_token
+from fractal_feature_explorer.utils.event_loop import (
+    run_coroutine,
+    to_thread_with_script_context,
+)
+from fractal_feature_explorer.utils.ngio_io_caches import (
+    _get_and_validate_store,
+    _get_ome_zarr_plate,
+    _get_plate_images_index,
+)
+from fractal_feature_explorer.utils.plate_manifest import (
+    read_plate_manifest,
+    write_plate_manifest,
+)
+
+logger = get_logger(__name__)
+
+# Polars dtypes of the anndata encoded (non-array) dataframe columns
+_ANNDATA_ENCODING_DTYPES = {
+    "categorical": "Categorical",
+    "nullable-integer": "Int64",
+    "nullable-boolean": "Boolean",
+    "string-array": "String",
+    "nullable-string-array": "String",
+}
+
+
+@dataclass
+class TableInfo:
+    """Description of a single table."""
+
+    name: str
+    table_type: str
+    backend: str | None = None
+    reference_label: str | None = None
+    num_rows: int | None = None
+    schema: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class PlateCatalog:
+    """Description of the tables of a plate and of its images."""
+
+    plate_url: str
+    plate_tables: dict[str, TableInfo] = field(default_factory=dict)
+    # image path (row/column/path_in_well) -> table name -> table info
+    images_tables: dict[str, dict[str, TableInfo]] = field(default_factory=dict)
+
+    @property
+    def images_paths(self) -> list[str]:
+        return list(self.images_tables)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PlateCatalog":
+        return cls(
+            plate_url=data["plate_url"],
+            plate_tables={
+                name: TableInfo(**info) for name, info in data["plate_tables"].items()
+            },
+            images_tables={
+                path: {name: TableInfo(**info) for name, info in tables.items()}
+                for path, tables in data["images_tables"].items()
+            },
+        )
+
+
+def _numpy_dtype_to_polars(dtype: np.dtype) -> str:
+    """Get the name of the polars dtype matching a numpy dtype."""
+    if dtype.kind in ("O", "U", "S", "T"):
+        return "String"
+    return str(pl.Series(np.empty(0, dtype=dtype)).dtype)
+
+
+def _zarr_node_dtype(node: zarr.Array | zarr.Group) -> str:
+    """Get the polars dtype name of an anndata encoded column."""
+    if isinstance(node, zarr.Array):
+        return _numpy_dtype_to_polars(np.dtype(node.dtype))
+    encoding = node.attrs.get("encoding-type", "")
+    return _ANNDATA_ENCODING_DTYPES.get(str(encoding), "Object")
+
+
+def _anndata_table_stats(
+    group: zarr.Group,
+    index_key: str | None,
+    index_type: str | None,
+) -> tuple[int | None, dict[str, str]]:
+    """Read the number of rows and the schema of an anndata table.
+
+    Only the zarr metadata (and the small `var` index) are read.
+    """
+    obs = group["obs"]
+    assert isinstance(obs, zarr.Group)
+    obs_index = obs[str(obs.attrs["_index"])]
+    num_rows = obs_index.shape[0] if isinstance(obs_index, zarr.Array) else None
+
+    schema = {}
+    if index_key is not None:
+        schema[index_key] = "Int64" if index_type == "int" else "String"
+    for column in obs.attrs.get("column-order", []):  # type: ignore
+        schema[str(column)] = _zarr_node_dtype(obs[str(column)])
+
+    if "X" in group:
+        x_dtype = _zarr_node_dtype(group["X"])
+        var = group["var"]
+        assert isinstance(var, zarr.Group)
+        var_index = var[str(var.attrs["_index"])]
+        assert isinstance(var_index, zarr.Array)
+        for name in var_index[:]:  # type: ignore
+            schema[str(name)] = x_dtype
+    return num_rows, schema
+
+
+def _parquet_num_rows(root: zarr.Group, path: str) -> int | None:
+    """Read the number of rows of a parquet table from its footer.
+
+    Only the footer is fetched (two suffix range requests), not the data.
+    """
+    key = f"{root.path}/{path}/table.parquet".lstrip("/")
+    prototype = default_buffer_prototype()
+    tail = sync(root.store.get(key, prototype, byte_range=SuffixByteRequest(8)))
+    if tail is None or tail.to_bytes()[4:] != b"PAR1":
+        return None
+    footer_size = int.from_bytes(tail.to_bytes()[:4], "little")
+    footer = sync(
+        root.store.get(key, prototype, byte_range=SuffixByteRequest(footer_size + 8))
+    )
+    if footer is None:
+        return None
+    metadata = pq.read_metadata(pa.BufferReader(b"PAR1" + footer.to_bytes()))
+    return metadata.num_rows
+
+
+def _table_info(
+    container: OmeZarrPlate | OmeZarrContainer,
+    name: str,
+    root: zarr.Group,
+    path: str,
+) -> TableInfo | None:
+    """Describe a table, reading its metadata only.
+
+    The number of rows is read from the anndata `obs` index shape or the
+    parquet footer, it is None for the other backends (counting their rows
+    would read the whole table).
+    """
+    try:
+        table = container.get_table(name)
+    except Exception as e:
+        logger.warning(f"Table {name} at {path} can not be read: {e}")
+        return None
+
+    info = TableInfo(
+        name=name,
+        table_type=table.table_type(),
+        backend=table.backend_name,
+    )
+    if isinstance(table, FeatureTable):
+        info.reference_label = table.reference_label
+
+    try:
+        if info.backend is not None and info.backend.startswith("anndata"):
+            group = root[path]
+            assert isinstance(group, zarr.Group)
+            info.num_rows, info.schema = _anndata_table_stats(
+                group, index_key=table.index_key, index_type=table.index_type
+            )
+        else:
+            lazy_frame = table.load_as_polars_lf()
+            info.schema = {
+                column: str(dtype)
+                for column, dtype in lazy_frame.collect_schema().items()
+            }
+            if info.backend == "parquet":
+                info.num_rows = _parquet_num_rows(root, path)
+    except Exception as e:
+        logger.warning(f"Could not read the statistics of table {name} at {path}: {e}")
+    return info
+
+
+def _container_tables(
+    container: OmeZarrPlate | OmeZarrContainer,
+    root: zarr.Group,
+    prefix: str,
+) -> dict[str, TableInfo]:
+    """Describe all the tables of a plate or of an image."""
+    tables = {}
+    for name in container.list_tables():
+        info = _table_info(container, name, root, path=f"{prefix}tables/{name}")
+        if info is not None:
+            tables[name] = info
+    return tables
+
+
+async def _discover_plate_catalog_async(
+    plate_url: str,
+    plate: OmeZarrPlate,
+    images: dict[str, OmeZarrContainer],
+    root: zarr.Group,
+    max_concurrency: int = 32,
+) -> PlateCatalog:
+    """Describe the tables of the plate and of all its images concurrently."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _describe(
+        container: OmeZarrPlate | OmeZarrContainer, prefix: str
+    ) -> dict[str, TableInfo]:
+        async with semaphore:
+            return await to_thread_with_script_context(
+                _container_tables, container, root, prefix
+            )
+
+    plate_tables, *images_tables = await asyncio.gather(
+        _describe(plate, ""),
+        *(_describe(image, f"{path}/") for path, image in images.items()),
+    )
+    return PlateCatalog(
+        plate_url=plate_url,
+        plate_tables=plate_tables,
+        images_tables=dict(zip(images.keys(), images_tables, strict=True)),
+    )
+
+
+def build_plate_catalog(
+    plate_url: str, fractal_token: str | None = None
+) -> PlateCatalog:
+    """Build the tables catalog of a plate, describing all its tables."""
+    start = time.perf_counter()
+    plate = _get_ome_zarr_plate(plate_url, fractal_token=fractal_token)
+    # The images index is built on the shared event loop, so it must be
+    # resolved here, before the images are described from its workers
+    images = _get_plate_images_index(plate_url, fractal_token=fractal_token)
+    store = _get_and_validate_store(plate_url, fractal_token=fractal_token)
+    if store is None:
+        raise ValueError(f"Could not get store for URL: {plate_url}")
+    root = zarr.open_group(store, mode="r")
+
+    catalog = run_coroutine(
+        _discover_plate_catalog_async(
+            plate_url,
+            plate=plate,
+            images=images,
+            root=root,
+            max_concurrency=get_config().max_concurrent_images,
+        )
+    )
+    logger.info(
+        f"Tables catalog of plate {plate_url} built in "
+        f"{time.perf_counter() - start:.2f}s ({len(images)} images)."
+    )
+    return catalog
+
+
+def index_plate(plate_url: str, fractal_token: str | None = None) -> str:
+    """Build the tables catalog of a plate and write it as the plate manifest."""
+    catalog = build_plate_catalog(plate_url, fractal_token=fractal_token)
+    content = {**catalog.to_dict(), "images_paths": catalog.images_paths}
+    return write_plate_manifest(plate_url, content, fractal_token=fractal_token)
+
+
+@st_cache_data_wrapper(source="plate_url", authorize="plate_url")
+def _get_plate_catalog(
+    plate_url: str, fractal_token: str | None = None
+) -> PlateCatalog:
+    manifest = read_plate_manifest(plate_url, fractal_token=fractal_token)
+    if manifest is not None:
+        return PlateCatalog.from_dict({**manifest, "plate_url": plate_url})
+    return build_plate_catalog(plate_url, fractal_token=fractal_token)
+
+
+def get_plate_catalog(plate_url: str) -> PlateCatalog:
+    """Get the (cached) tables catalog of a plate."""
+    return _get_plate_catalog(plate_url, fractal_token=get_fractal_token())
+
+
+def _coalesce_tables_names(
+    tables_names: list[list[str]],
+    mode: Literal["all", "common"] = "common",
+) -> list[str]:
+    """Merge lists of table names, keeping the order of first appearance."""
+    counts: dict[str, int] = {}
+    for names in tables_names:
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+
+    if mode == "all":
+        return list(counts)
+    elif mode == "common":
+        return [name for name, count in counts.items() if count == len(tables_names)]
+    else:
+        raise ValueError(f"Invalid mode {mode}. Must be 'all' or 'common'.")
+
+
+def _filter_tables(
+    tables: dict[str, TableInfo], filter_types: str | None = None
+) -> list[str]:
+    return [
+        name
+        for name, info in tables.items()
+        if filter_types is None or info.table_type == filter_types
+    ]
+
+
+def query_plate_tables(
+    plate_urls: list[str],
+    filter_types: str | None = None,
+    mode: Literal["all", "common"] = "common",
+) -> list[str]:
+    """List the plate-level tables of the plates (present in all or any plate)."""
+    tables_names = [
+        _filter_tables(get_plate_catalog(url).plate_tables, filter_types)
+        for url in plate_urls
+    ]
+    return _coalesce_tables_names(tables_names, mode=mode)
+
+
+def query_images_tables(
+    images: list[tuple[str, str]],
+    filter_types: str | None = None,
+    mode: Literal["all", "common"] = "common",
+) -> list[str]:
+    """List the image-level tables of the (plate URL, image path) images."""
+    # The catalog is fetched once per plate, not once per image
+    catalogs = {
+        plate_url: get_plate_catalog(plate_url)
+        for plate_url in dict.fromkeys(plate_url for plate_url, _ in images)
+    }
+    tables_names = []
+    for plate_url, image_path in images:
+        images_tables = catalogs[plate_url].images_tables
+        tables_names.append(
+            _filter_tables(images_tables.get(image_path, {}), filter_types)
+        )
+    return _coalesce_tables_names(tables_names, mode=mode)
+
+
+def find_table_info(
+    plate_url: str,
+    table_name: str,
+    image_path: str | None = None,
+) -> TableInfo | None:
+    """Get the description of a plate table, or of an image table."""
+    catalog = get_plate_catalog(plate_url)
+    if image_path is None:
+        return catalog.plate_tables.get(table_name)
+    return catalog.images_tables.get(image_path, {}).get(table_name)
@@ -0,0 +1,66 @@
+from fractal_feature_explorer import config as config_module
+from fractal_feature_explorer.utils import cache_admin, memory_cache
+from fractal_feature_explorer.utils.cache_admin import plate_url_of, url_in_plate
+from fractal_feature_explorer.utils.disk_cache import DiskLRUCache, hash_key
+from fractal_feature_explorer.utils.memory_cache import MemoryLRUCache
+
+
+def test_plate_urls():
+    plate_url = "https://example.com/data/plate.zarr"
+    assert plate_url_of(f"{plate_url}/B/03/0") == plate_url
+    assert plate_url_of(plate_url) == plate_url
+    assert url_in_plate(f"{plate_url}/B/03/0", plate_url)
+    assert url_in_plate(plate_url, f"{plate_url}/")
+    assert not url_in_plate("https://example.com/data/plate.zarr2", plate_url)
+
+
+def test_evict_plate_entries():
+    cache = MemoryLRUCache(max_bytes=None)
+    cache.put("tables", "a", 1, urls=("/data/a.zarr/B/03/0",), table_name="nuclei")
+    cache.put("tables", "b", 2, urls=("/data/b.zarr",), table_name="nuclei")
+    cache.put("setup", "ab", 3, urls=("/data/a.zarr", "/data/b.zarr"))
+
+    num_evicted = cache.evict_entries(
+        lambda entry: any(url_in_plate(url, "/data/a.zarr") for url in entry.urls)
+    )
+    assert num_evicted == 2
+    assert [entry.func_name for _, entry in cache.entries()] == ["tables"]
+    assert cache.get("tables", "b") == (True, 2)
+
+
+def test_evict_plate_http_blocks(tmp_path, monkeypatch):
+    block_cache = DiskLRUCache(tmp_path, max_bytes=1024**2)
+    for url in ("https://x.org/a.zarr/B/03/0/zarr.json", "https://x.org/b.zarr"):
+        block_cache.put(hash_key(url, None, None), b"data", {"url": url})
+    monkeypatch.setattr(cache_admin, "get_http_block_cache", lambda: block_cache)
+
+    entries = cache_admin.list_cache_entries()
+    assert "https://x.org/a.zarr" in entries["plate_url"].to_list()
+
+    evicted = cache_admin.evict_plate("https://x.org/a.zarr")
+    assert evicted["http_block_cache"] == 1
+    assert len(block_cache.entries()) == 1
+
+
+def test_cache_page_evicts_loaders_entries(monkeypatch):
+    config = config_module.get_config().model_copy(
+        update={"cache_admin_page": True, "cache_max_bytes": None}
+    )
+    monkeypatch.setattr(config_module, "get_config", lambda: config)
+    monkeypatch.setattr(cache_admin, "get_config", lambda: config)
+    monkeypatch.setattr(memory_cache, "_memory_cache", MemoryLRUCache(max_bytes=None))
+    calls = []
+
+    # Without byte budget, the loaders are still evicted by plate
+    @config_module.st_cache_data_wrapper
+    def _load(plate_url: str) -> int:
+        calls.append(plate_url)
+        return len(calls)
+
+    assert _load("/data/a.zarr") == 1
+    assert _load("/data/a.zarr") == 1
+    entries = cache_admin.list_cache_entries()
+    assert entries["plate_url"].to_list() == ["/data/a.zarr"]
+
+    assert cache_admin.evict_plate("/data/a.zarr")["memory"] == 1
+    assert _load("/data/a.zarr") == 2
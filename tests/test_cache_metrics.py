@@ -0,0 +1,40 @@
+import asyncio
+
+from starlette.requests import Request
+
+from fractal_feature_explorer import config as config_module
+from fractal_feature_explorer.app import endpoint_metrics
+from fractal_feature_explorer.utils.cache_metrics import (
+    record_call,
+    record_compute,
+    render_metrics,
+)
+
+
+def test_render_metrics():
+    for _ in range(3):
+        record_call("_test_loader")
+    record_compute("_test_loader", 0.2)
+    record_compute("_test_loader", 20.0, error=True)
+
+    lines = render_metrics().splitlines()
+    prefix = "fractal_explorer_cache"
+    assert f'{prefix}_hits_total{{function="_test_loader"}} 1' in lines
+    assert f'{prefix}_misses_total{{function="_test_loader"}} 2' in lines
+    assert f'{prefix}_errors_total{{function="_test_loader"}} 1' in lines
+    bucket = f"{prefix}_compute_seconds_bucket"
+    assert f'{bucket}{{function="_test_loader",le="0.5"}} 1' in lines
+    assert f'{bucket}{{function="_test_loader",le="30.0"}} 2' in lines
+    assert f'{bucket}{{function="_test_loader",le="+Inf"}} 2' in lines
+    assert any(line.startswith("fractal_explorer_process_resident") for line in lines)
+
+
+def test_metrics_endpoint_can_be_disabled(monkeypatch):
+    request = Request({"type": "http", "method": "GET", "path": "/metrics"})
+    response = asyncio.run(endpoint_metrics(request))
+    assert response.status_code == 200
+
+    config = config_module.get_config().model_copy(update={"metrics_endpoint": False})
+    monkeypatch.setattr(config_module, "get_config", lambda: config)
+    response = asyncio.run(endpoint_metrics(request))
+    assert response.status_code == 404
@@ -0,0 +1,57 @@
+import ngio
+import polars as pl
+from ngio import ImageInWellPath
+from ngio.tables import FeatureTable
+
+from fractal_feature_explorer.pages.setup_page._cache_warming import warm_plates
+from fractal_feature_explorer.utils import cache_metrics
+
+
+def _create_plate(path) -> str:
+    plate_url = str(path / "plate.zarr")
+    plate = ngio.create_empty_plate(
+        plate_url, "plate", images=[ImageInWellPath(row="B", column="03", path="0")]
+    )
+    ngio.create_synthetic_ome_zarr(f"{plate_url}/B/03/0", shape=(1, 64, 64), levels=1)
+    features = pl.DataFrame(
+        {
+            "label": [1, 2, 3],
+            "row": ["B"] * 3,
+            "column": [3] * 3,
+            "path_in_well": ["0"] * 3,
+            "area": [10.0, 20.0, 30.0],
+        }
+    )
+    plate.add_table(
+        "features", FeatureTable(features, reference_label="nuclei"), backend="parquet"
+    )
+    return plate_url
+
+
+def test_warm_plates_reports_errors(tmp_path):
+    reported = []
+    steps = warm_plates(
+        [str(tmp_path / "missing.zarr")],
+        table_names=["features"],
+        progress=reported.append,
+    )
+    assert reported == steps
+    assert [step.name for step in steps] == ["plate setup table"]
+    assert steps[0].error is not None
+
+
+def test_warm_plates_fills_the_caches(tmp_path, monkeypatch):
+    plate_url = _create_plate(tmp_path)
+    steps = warm_plates([plate_url], table_names=["features"])
+    assert [step.error for step in steps] == [None] * 4
+
+    computed = []
+    monkeypatch.setattr(
+        cache_metrics,
+        "record_compute",
+        lambda func_name, *args, **kwargs: computed.append(func_name),
+    )
+    steps = warm_plates([plate_url], table_names=["features"])
+    assert [step.error for step in steps] == [None] * 4
+    # The second load only hits the caches
+    assert computed == []
@@ -0,0 +1,37 @@
+import fsspec
+import pytest
+import zarr
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+
+from fractal_feature_explorer.utils.consolidated_metadata import (
+    ConsolidatedFsspecStore,
+    consolidated_store,
+)
+
+
+@pytest.mark.parametrize("zarr_format", [2, 3])
+def test_consolidated_store(tmp_path, zarr_format):
+    path = tmp_path / "plate.zarr"
+    root = zarr.open_group(path, mode="w", zarr_format=zarr_format)
+    root.attrs["plate"] = {"name": "plate"}
+    well = root.create_group("A/01")
+    well.attrs["well"] = {"images": [{"path": "0"}]}
+    zarr.consolidate_metadata(path)
+    # Written after the consolidation, so only readable from the store
+    root.create_group("B/01").attrs["well"] = {"images": []}
+
+    fs = AsyncFileSystemWrapper(fsspec.filesystem("file"), asynchronous=True)
+    store = consolidated_store(fs.get_mapper(str(path)))
+    assert isinstance(store, ConsolidatedFsspecStore)
+
+    group = zarr.open_group(store, mode="r", use_consolidated=False)
+    assert group["A/01"].attrs["well"] == {"images": [{"path": "0"}]}
+    assert group["B/01"].attrs["well"] == {"images": []}
+
+
+def test_consolidated_store_not_consolidated(tmp_path):
+    path = tmp_path / "plate.zarr"
+    zarr.open_group(path, mode="w", zarr_format=2)
+    fs = AsyncFileSystemWrapper(fsspec.filesystem("file"), asynchronous=True)
+    fs_map = fs.get_mapper(str(path))
+    assert consolidated_store(fs_map) is fs_map
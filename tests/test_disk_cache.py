@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import polars as pl
+
+from fractal_feature_explorer.utils.disk_cache import DiskLRUCache
+from fractal_feature_explorer.utils.table_disk_cache import (
+    read_cached_table,
+    write_cached_table,
+)
+
+
+def test_disk_lru_cache_eviction(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=25)
+    cache.put("a", b"0" * 10, {"etag": "a"})
+    cache.put("b", b"1" * 10, {"etag": "b"})
+    # Touch "a", so that "b" becomes the least recently used entry
+    assert cache.get("a") == (b"0" * 10, {"etag": "a"})
+
+    cache.put("c", b"2" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    stats = cache.stats()
+    assert stats.num_entries == 2
+    assert stats.total_bytes == 20
+    assert stats.evictions == 1
+
+
+def test_disk_lru_cache_reload(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=100)
+    cache.put("a", b"0" * 10, {"etag": "a"})
+
+    reloaded_cache = DiskLRUCache(tmp_path, max_bytes=100)
+    assert reloaded_cache.get("a") == (b"0" * 10, {"etag": "a"})
+    assert reloaded_cache.stats().total_bytes == 10
+
+
+def test_table_disk_cache(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=10**6, suffix=".arrow")
+    table = pl.DataFrame({"label": ["1", "2"], "area": [1.5, 2.5]}).with_columns(
+        pl.col("label").cast(pl.Categorical)
+    )
+    assert read_cached_table(cache, "key") is None
+
+    write_cached_table(cache, "key", table, {"table_name": "features"})
+    cached = read_cached_table(cache, "key")
+    assert cached is not None
+    assert cached.equals(table)
+
+
+def test_disk_lru_cache_shared_directory(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=100)
+    other_process_cache = DiskLRUCache(tmp_path, max_bytes=100)
+    other_process_cache.put("a", b"0" * 10, {"etag": "a"})
+
+    assert cache.get("a") == (b"0" * 10, {"etag": "a"})
+    assert cache.stats().total_bytes == 10
+
+
+def test_disk_lru_cache_defers_locked_deletes(tmp_path, monkeypatch):
+    cache = DiskLRUCache(tmp_path, max_bytes=15)
+    cache.put("a", b"0" * 10)
+
+    # A memory-mapped file can not be removed on Windows
+    unlink = Path.unlink
+
+    def _locked_unlink(path, missing_ok=False):
+        if path.suffix == ".bin":
+            raise PermissionError(f"{path} is in use")
+        unlink(path, missing_ok=missing_ok)
+
+    monkeypatch.setattr(Path, "unlink", _locked_unlink)
+    cache.put("b", b"1" * 10)
+    assert cache.get("a") is None
+    assert (tmp_path / "a.bin").exists()
+
+    monkeypatch.setattr(Path, "unlink", unlink)
+    cache.put("c", b"2" * 10)
+    assert not (tmp_path / "a.bin").exists()
+    assert cache.get("c") is not None
@@ -0,0 +1,29 @@
+import asyncio
+import threading
+
+from fractal_feature_explorer.utils.event_loop import (
+    run_coroutine,
+    to_thread_with_script_context,
+)
+
+
+def test_run_coroutine_nested_in_worker_threads():
+    loop_threads = set()
+
+    async def _inner() -> int:
+        await asyncio.sleep(0)
+        loop_threads.add(threading.current_thread().name)
+        return 1
+
+    def _load() -> int:
+        # A cached loader calling run_coroutine from an executor thread
+        return run_coroutine(_inner())
+
+    async def _outer() -> list[int]:
+        return await asyncio.gather(
+            *(to_thread_with_script_context(_load) for _ in range(64))
+        )
+
+    assert run_coroutine(_outer(), timeout=30) == [1] * 64
+    # The nested coroutines run in the shared loop, not in private loops
+    assert loop_threads == {"fractal-explorer-event-loop"}
@@ -0,0 +1,55 @@
+from fractal_feature_explorer.utils.http_pool import _host_from_url
+
+
+def test_host_from_url():
+    assert (
+        _host_from_url("https://example.com/data/plate.zarr/B/03/0")
+        == "https://example.com"
+    )
+    assert (
+        _host_from_url("http://localhost:3000/data/plate.zarr")
+        == "http://localhost:3000"
+    )
+
+
+def test_pools_are_bounded(monkeypatch):
+    from fractal_feature_explorer.utils import http_pool
+
+    config = http_pool.get_config().model_copy(update={"http_max_pools": 2})
+    monkeypatch.setattr(http_pool, "get_config", lambda: config)
+    monkeypatch.setattr(http_pool, "_pools", http_pool.OrderedDict())
+
+    url = "https://example.com/data/plate.zarr"
+    first = http_pool._get_pool(url, fractal_token="token-1")
+    http_pool._get_pool(url, fractal_token="token-2")
+    assert http_pool._get_pool(url, fractal_token="token-1") is first
+    http_pool._get_pool(url, fractal_token="token-3")
+
+    assert list(http_pool._pools) == [
+        ("https://example.com", "token-1"),
+        ("https://example.com", "token-3"),
+    ]
+
+
+def test_evicted_pools_are_closed_after_their_stores(monkeypatch):
+    from fractal_feature_explorer.utils import http_pool
+
+    config = http_pool.get_config().model_copy(update={"http_max_pools": 1})
+    monkeypatch.setattr(http_pool, "get_config", lambda: config)
+    monkeypatch.setattr(http_pool, "_pools", http_pool.OrderedDict())
+    monkeypatch.setattr(http_pool, "_pools_to_close", [])
+    closed = []
+    monkeypatch.setattr(http_pool, "_close_pool", closed.append)
+
+    url = "https://example.com/data/plate.zarr"
+    pool = http_pool._get_pool(url, fractal_token="token-1")
+    monkeypatch.setattr(http_pool, "check_http_access", lambda *args, **kwargs: pool)
+    store = http_pool.pooled_fsspec_store(url, fractal_token="token-1")
+
+    # The evicted pool is still used by a (cached) store
+    http_pool._get_pool(url, fractal_token="token-2")
+    assert closed == []
+
+    del store
+    http_pool._get_pool(url, fractal_token="token-2")
+    assert closed == [pool]
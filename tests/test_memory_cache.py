@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import polars as pl
+
+from fractal_feature_explorer.utils import memory_cache
+from fractal_feature_explorer.utils.memory_cache import MemoryLRUCache, estimate_size
+
+
+def test_estimate_size():
+    array = np.zeros((100, 100), dtype="uint16")
+    table = pl.DataFrame({"label": list(range(1000))})
+    assert estimate_size(array) == array.nbytes
+    assert estimate_size(table) == table.estimated_size()
+    assert estimate_size({"a": array}) > array.nbytes
+
+
+def test_memory_cache_budgets():
+    cache = MemoryLRUCache(max_bytes=35_000, pools_max_bytes={"crops": 10_000})
+    table = pl.DataFrame({"x": np.zeros(1000)})  # 8 kB
+    crop = np.zeros(1000, dtype="uint8")  # 1 kB
+
+    cache.put("tables", "t1", table)
+    cache.put("tables", "t2", table)
+    for i in range(20):
+        cache.put("crops", f"c{i}", crop)
+
+    # The crops are evicted within their own budget only
+    assert cache.get("tables", "t1")[0]
+    assert not cache.get("crops", "c0")[0]
+    assert cache.get("crops", "c19")[0]
+
+    # Least recently used tables are evicted first
+    cache.put("tables", "t3", table)
+    cache.put("tables", "t4", table)
+    assert not cache.get("tables", "t2")[0]
+    assert cache.get("tables", "t1")[0]
+
+    stats = {s.name: s for s in cache.stats()}
+    assert stats["default"].total_bytes + stats["crops"].total_bytes <= 35_000
+    assert stats["crops"].num_entries == 10
+
+
+def test_memory_cache_global_budget():
+    cache = MemoryLRUCache(max_bytes=20_000, pools_max_bytes={"crops": 10_000})
+    table = pl.DataFrame({"x": np.zeros(1000)})  # 8 kB
+    crop = np.zeros(1000, dtype="uint8")  # 1 kB
+
+    cache.put("tables", "t1", table)
+    cache.put("tables", "t2", table)
+    for i in range(8):
+        cache.put("crops", f"c{i}", crop)
+
+    # The function budgets are counted in the global budget, and the crops
+    # evict their own entries first
+    stats = {s.name: s for s in cache.stats()}
+    assert stats["default"].total_bytes + stats["crops"].total_bytes <= 20_000
+    assert cache.get("tables", "t1")[0] and cache.get("tables", "t2")[0]
+    assert not cache.get("crops", "c0")[0]
+    assert cache.get("crops", "c7")[0]
+
+    # A pool without other entries evicts the least recently used of the others
+    cache.clear()
+    for i in range(10):
+        cache.put("crops", f"c{i}", crop)
+    cache.put("tables", "t1", pl.DataFrame({"x": np.zeros(1500)}))  # 12 kB
+    stats = {s.name: s for s in cache.stats()}
+    assert cache.get("tables", "t1")[0]
+    assert stats["crops"].num_entries == 8
+    assert not cache.get("crops", "c1")[0]
+
+
+def test_memory_cache_function_max_entries():
+    cache = MemoryLRUCache(max_bytes=None)
+    cache.set_max_entries("tables", 2)
+    for i in range(3):
+        cache.put("tables", f"t{i}", i)
+        cache.put("crops", f"c{i}", i)
+
+    assert not cache.get("tables", "t0")[0]
+    assert cache.get("tables", "t1")[0] and cache.get("tables", "t2")[0]
+    assert all(cache.get("crops", f"c{i}")[0] for i in range(3))
+
+
+def test_memory_cache_compresses_cold_tables():
+    cache = MemoryLRUCache(max_bytes=None, compress_after=0.0)
+    table = pl.DataFrame({"row": ["A"] * 200_000, "label": list(range(200_000))})
+    cache.put("tables", "t1", table.clone())
+    cache.put("tables", "small", table.head(10))
+    cache.wait_for_compression(timeout=30)
+
+    stats = cache.stats()[0]
+    # Small tables are not compressed
+    assert stats.num_compressed == 1
+    assert stats.total_bytes < table.estimated_size() / 2
+    assert stats.compression_ratio > 2
+
+    found, value = cache.get("tables", "t1")
+    assert found
+    assert value.equals(table)
+    assert cache.stats()[0].decompressions == 1
+
+
+def test_memory_cache_does_not_compress_referenced_tables():
+    cache = MemoryLRUCache(max_bytes=None, compress_after=0.0)
+    table = pl.DataFrame({"row": ["A"] * 200_000, "label": list(range(200_000))})
+    # A value still used by a caller, e.g. returned by a resource function
+    cache.put("tables", "resource", table)
+    # A value whose copy is kept by a caller, e.g. in a session state
+    cache.put("tables", "data", table.clone())
+    copy = cache.get("tables", "data")[1].clone()
+    cache.track_copy("tables", "data", copy)
+    cache.wait_for_compression(timeout=30)
+    assert cache.stats()[0].num_compressed == 0
+
+    del table, copy
+    cache.compress_cold_entries()
+    assert cache.stats()[0].num_compressed == 2
+
+
+def test_memory_cache_compresses_entries_once(monkeypatch):
+    cache = MemoryLRUCache(max_bytes=None, compress_after=None)
+    table = pl.DataFrame({"row": ["A"] * 200_000, "label": list(range(200_000))})
+    cache.put("tables", "t1", table.clone())
+    cache._compress_after = 0.0
+
+    compressed = []
+    compress_table = memory_cache.compress_table
+
+    def _compress_table(table, compression="zstd"):
+        compressed.append(table)
+        return compress_table(table, compression=compression)
+
+    monkeypatch.setattr(memory_cache, "compress_table", _compress_table)
+    threads = [threading.Thread(target=cache.compress_cold_entries) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(compressed) == 1
+    assert cache.stats()[0].num_compressed == 1
@@ -1,4 +1,10 @@
-from fractal_feature_explorer.utils.ngio_io_caches import _url_belongs_to_base
+import time
+
+from fractal_feature_explorer.utils.ngio_io_caches import (
+    _access_checked,
+    _access_checks,
+    _url_belongs_to_base,
+)
 
 
 def test_url_belongs_to_base():
@@ -19,3 +25,14 @@ def test_url_belongs_to_base():
 
     for url in negative_test_urls:
         assert not _url_belongs_to_base(url, base_url)
+
+
+def test_access_checked():
+    plate_url = "https://example.com/data/plate.zarr"
+    _access_checks[(plate_url, "token")] = time.time()
+
+    assert _access_checked(plate_url, "token", ttl=60)
+    assert _access_checked(f"{plate_url}/B/03/0", "token", ttl=60)
+    assert not _access_checked(f"{plate_url}/B/03/0", "other-token", ttl=60)
+    assert not _access_checked("https://example.com/data/other.zarr", "token", ttl=60)
+    assert not _access_checked(plate_url, "token", ttl=0)
@@ -0,0 +1,35 @@
+from fractal_feature_explorer.utils import source_fingerprint
+from fractal_feature_explorer.utils.plate_manifest import (
+    read_plate_manifest,
+    write_plate_manifest,
+)
+
+
+def test_plate_manifest_freshness(tmp_path, monkeypatch):
+    config = source_fingerprint.get_config().model_copy(
+        update={"source_fingerprint_ttl": 0.0}
+    )
+    monkeypatch.setattr(source_fingerprint, "get_config", lambda: config)
+
+    plate_path = tmp_path / "plate.zarr"
+    plate_path.mkdir()
+    (plate_path / ".zattrs").write_text('{"plate": {"wells": []}}')
+    plate_url = str(plate_path)
+
+    content = {"plate_url": plate_url, "images_paths": ["A/01/0"]}
+    write_plate_manifest(plate_url, content)
+    manifest = read_plate_manifest(plate_url)
+    assert manifest is not None
+    assert manifest["images_paths"] == ["A/01/0"]
+
+    # The manifest is stale once a table is written in one of the images
+    tables_path = plate_path / "A/01/0/tables"
+    tables_path.mkdir(parents=True)
+    (tables_path / ".zattrs").write_text('{"tables": ["features"]}')
+    assert read_plate_manifest(plate_url) is None
+
+    # The manifest is stale once the plate metadata changes
+    write_plate_manifest(plate_url, content)
+    assert read_plate_manifest(plate_url) is not None
+    (plate_path / ".zattrs").write_text('{"plate": {"wells": [{"path": "A/01"}]}}')
+    assert read_plate_manifest(plate_url) is None
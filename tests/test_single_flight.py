@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fractal_feature_explorer.utils.single_flight import single_flight
+
+
+def test_single_flight_deduplicates_concurrent_calls():
+    num_calls = 0
+    started = threading.Event()
+
+    def _load():
+        nonlocal num_calls
+        num_calls += 1
+        started.set()
+        time.sleep(0.2)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(single_flight, "key", _load)
+        started.wait()
+        waiters = [executor.submit(single_flight, "key", _load) for _ in range(3)]
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert num_calls == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_single_flight_propagates_errors_and_timeouts():
+    started = threading.Event()
+
+    def _fail():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("load failed")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(single_flight, "failing", _fail)
+        started.wait()
+        waiter = executor.submit(single_flight, "failing", _fail)
+        impatient = executor.submit(single_flight, "failing", _fail, timeout=0.01)
+        with pytest.raises(ValueError, match="load failed"):
+            leader.result()
+        with pytest.raises(ValueError, match="load failed"):
+            waiter.result()
+        with pytest.raises(TimeoutError):
+            impatient.result()
+
+    # Nothing is in flight anymore, so the next call is computed again
+    assert single_flight("failing", lambda: 1) == 1
+
+
+def test_single_flight_does_not_share_interruptions():
+    class _Rerun(BaseException):
+        pass
+
+    started = threading.Event()
+
+    def _interrupted():
+        started.set()
+        time.sleep(0.2)
+        raise _Rerun()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight, "interrupted", _interrupted)
+        started.wait()
+        waiter = executor.submit(single_flight, "interrupted", lambda: "value")
+        with pytest.raises(_Rerun):
+            leader.result()
+        # The waiter computes the value itself instead of raising the rerun
+        assert waiter.result() == "value"
@@ -0,0 +1,82 @@
+import os
+
+from fractal_feature_explorer.config import get_config, st_cache_data_wrapper
+from fractal_feature_explorer.utils import (
+    source_fingerprint as source_fingerprint_module,
+)
+from fractal_feature_explorer.utils.source_fingerprint import (
+    _local_fingerprint,
+    source_fingerprint,
+    sources_fingerprints,
+)
+
+
+def test_local_fingerprint(tmp_path):
+    table_path = tmp_path / "plate.zarr" / "tables" / "features"
+    table_path.mkdir(parents=True)
+    assert source_fingerprint(str(tmp_path / "plate.zarr"), "tables/features") is None
+
+    (table_path / ".zattrs").write_text('{"type": "feature_table"}')
+    fingerprint = _local_fingerprint(table_path)
+    assert fingerprint is not None
+    assert source_fingerprint(str(tmp_path), "plate.zarr/tables/features") == (
+        fingerprint
+    )
+
+    # Rewriting the metadata changes the fingerprint
+    os.utime(table_path / ".zattrs", ns=(0, 0))
+    assert _local_fingerprint(table_path) != fingerprint
+
+
+def test_stale_entries_are_evicted(tmp_path, monkeypatch):
+    config = get_config().model_copy(update={"source_fingerprint_ttl": 0.0})
+    monkeypatch.setattr(
+        "fractal_feature_explorer.utils.source_fingerprint.get_config",
+        lambda: config,
+    )
+    metadata_path = tmp_path / "features" / ".zattrs"
+    metadata_path.parent.mkdir()
+    metadata_path.write_text("{}")
+    os.utime(metadata_path, ns=(1, 1))
+    calls = []
+
+    @st_cache_data_wrapper(source="url", source_path="features")
+    def _load(url: str) -> int:
+        calls.append(url)
+        return len(calls)
+
+    assert _load(str(tmp_path)) == 1
+    assert _load(str(tmp_path)) == 1
+    os.utime(metadata_path, ns=(2, 2))
+    assert _load(str(tmp_path)) == 2
+
+    # The entry of the first version was evicted when the source changed
+    os.utime(metadata_path, ns=(1, 1))
+    assert _load(str(tmp_path)) == 3
+
+
+def test_sources_fingerprints_batched_per_plate(tmp_path, monkeypatch):
+    plate_url = str(tmp_path / "plate.zarr")
+    for image in ("B/03/0", "B/03/1"):
+        table_path = tmp_path / "plate.zarr" / image / "tables" / "nuclei"
+        table_path.mkdir(parents=True)
+        (table_path / ".zattrs").write_text("{}")
+
+    calls = []
+    nodes_fingerprints = source_fingerprint_module.nodes_fingerprints
+
+    def _nodes_fingerprints(root_url, paths, fractal_token=None):
+        calls.append((root_url, paths))
+        return nodes_fingerprints(root_url, paths, fractal_token=fractal_token)
+
+    monkeypatch.setattr(
+        source_fingerprint_module, "nodes_fingerprints", _nodes_fingerprints
+    )
+    monkeypatch.setattr(source_fingerprint_module, "MAX_FINGERPRINTS", 1)
+    urls = [f"{plate_url}/B/03/0", f"{plate_url}/B/03/1"]
+    fingerprints = sources_fingerprints(urls, "tables/nuclei")
+
+    assert calls == [(plate_url, ["B/03/0/tables/nuclei", "B/03/1/tables/nuclei"])]
+    assert all(fingerprint is not None for fingerprint in fingerprints)
+    # The checked fingerprints are bounded
+    assert len(source_fingerprint_module._fingerprints) == 1
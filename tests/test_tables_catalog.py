@@ -0,0 +1,48 @@
+import polars as pl
+import zarr
+
+from fractal_feature_explorer.utils import tables_catalog
+from fractal_feature_explorer.utils.tables_catalog import (
+    PlateCatalog,
+    TableInfo,
+    _coalesce_tables_names,
+    _parquet_num_rows,
+)
+
+
+def test_coalesce_tables_names():
+    tables_names = [["a", "b", "c"], ["c", "a"], ["d", "a", "c"]]
+    assert _coalesce_tables_names(tables_names, mode="common") == ["a", "c"]
+    assert _coalesce_tables_names(tables_names, mode="all") == ["a", "b", "c", "d"]
+    assert _coalesce_tables_names([], mode="common") == []
+
+
+def test_parquet_num_rows(tmp_path):
+    path = tmp_path / "plate.zarr"
+    zarr.open_group(path, mode="w").create_group("A/01/0/tables/features")
+    table_path = path / "A/01/0/tables/features/table.parquet"
+    pl.DataFrame({"label": range(1234)}).write_parquet(table_path)
+
+    root = zarr.open_group(path, mode="r")
+    assert _parquet_num_rows(root, "A/01/0/tables/features") == 1234
+    assert _parquet_num_rows(root["A/01"], "0/tables/features") == 1234
+
+
+def test_query_images_tables_fetches_each_catalog_once(monkeypatch):
+    catalog = PlateCatalog(
+        plate_url="/data/plate.zarr",
+        images_tables={
+            "B/03/0": {"nuclei": TableInfo(name="nuclei", table_type="feature_table")},
+            "B/03/1": {"nuclei": TableInfo(name="nuclei", table_type="feature_table")},
+        },
+    )
+    fetched = []
+
+    def _get_plate_catalog(plate_url):
+        fetched.append(plate_url)
+        return catalog
+
+    monkeypatch.setattr(tables_catalog, "get_plate_catalog", _get_plate_catalog)
+    images = [("/data/plate.zarr", "B/03/0"), ("/data/plate.zarr", "B/03/1")]
+    assert tables_catalog.query_images_tables(images) == ["nuclei"]
+    assert fetched == ["/data/plate.zarr"]
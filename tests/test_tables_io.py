@@ -0,0 +1,123 @@
+import polars as pl
+
+from fractal_feature_explorer.pages.setup_page._tables_io import (
+    _join_feature_table_to_setup,
+    _project_feature_columns,
+    _setup_table_hash,
+    _wells_selection_predicate,
+    compact_feature_table,
+)
+
+
+def test_wells_selection_predicate():
+    table = pl.DataFrame(
+        {
+            "label": [1, 2, 3, 4],
+            "row": ["A", "A", "B", "B"],
+            "column": ["1", "2", "1", "1"],
+            "path_in_well": ["0", "0", "0", "1"],
+        }
+    )
+    predicate = _wells_selection_predicate(table.schema, [("A", 2, "0"), ("B", 1, "1")])
+    assert table.filter(predicate)["label"].to_list() == [2, 4]
+
+
+def test_project_feature_columns():
+    table = pl.LazyFrame(
+        {
+            "label": [1],
+            "row": ["A"],
+            "column": [1],
+            "path_in_well": ["0"],
+            "area": [1.0],
+            "intensity": [2.0],
+        }
+    )
+    assert _project_feature_columns(table, None).collect_schema().names() == [
+        "label",
+        "row",
+        "column",
+        "path_in_well",
+        "area",
+        "intensity",
+    ]
+    projected = _project_feature_columns(table, ["intensity"])
+    assert projected.collect_schema().names() == [
+        "label",
+        "row",
+        "column",
+        "path_in_well",
+        "intensity",
+    ]
+
+
+def test_compact_feature_table():
+    table = pl.DataFrame(
+        {
+            "image_url": ["/a/A/01/0", "/a/A/01/0", "/a/B/01/0"],
+            "label": [1, 2, 1],
+            "area": [1.5, 2.25, 3.0],
+            "precise": [1e-320, 1.0, 2.0],
+        }
+    )
+    compact, report = compact_feature_table(table)
+    assert compact.schema["image_url"] == pl.Categorical()
+    assert compact.schema["area"] == pl.Float32()
+    assert compact.schema["precise"] == pl.Float64()
+    assert compact.schema["label"] == pl.Int64()
+    assert report["column"].to_list() == ["image_url", "area"]
+    assert compact["image_url"].cast(pl.String).equals(table["image_url"])
+
+
+def test_join_compact_feature_table_to_setup():
+    setup = pl.DataFrame(
+        {
+            "plate_url": ["/a", "/a"],
+            "plate_name": ["a", "a"],
+            "row": ["A", "B"],
+            "column": [1, 1],
+            "path_in_well": ["0", "0"],
+            "image_url": ["/a/A/01/0", "/a/B/01/0"],
+        }
+    )
+    table = pl.DataFrame(
+        {
+            "label": ["1", "2", "1"],
+            "row": ["A", "A", "B"],
+            "column": [1, 1, 1],
+            "path_in_well": ["0", "0", "0"],
+            "plate_name": ["a", "a", "a"],
+            "area": [1.5, 2.25, 3.0],
+        }
+    )
+    compact, _ = compact_feature_table(table)
+    joined = _join_feature_table_to_setup(setup, compact)
+    assert joined.schema["row"] == pl.Categorical()
+    assert joined.schema["image_url"] == pl.Categorical()
+    assert sorted(joined["image_url"].cast(pl.String).to_list()) == [
+        "/a/A/01/0",
+        "/a/A/01/0",
+        "/a/B/01/0",
+    ]
+
+
+def test_setup_table_hash_ignores_rows_order():
+    setup_df = pl.DataFrame({"row": ["A", "B", "C"], "column": [1, 2, 3]})
+    assert _setup_table_hash(setup_df) == _setup_table_hash(setup_df.reverse())
+    assert _setup_table_hash(setup_df) != _setup_table_hash(setup_df.head(2))
+
+
+def test_wells_selection_predicate_is_flat():
+    selection = [
+        (row, column, "0") for row in "ABCDEFGHIJKLMNOP" for column in range(1, 97)
+    ]
+    table = pl.DataFrame(
+        {
+            "row": ["A", "P", "Q"],
+            "column": [1, 96, 1],
+            "path_in_well": ["0", "0", "0"],
+        }
+    )
+    predicate = _wells_selection_predicate(table.schema, selection)
+    assert predicate.meta.tree_format(return_as_string=True).count("\n") < 50
+    assert table.filter(predicate)["row"].to_list() == ["A", "P"]